@@ -76,6 +76,66 @@ def parse_date(dt):
     return parsed_date
 
 
+def get_regions(region_arg, aws_client, session_kwargs):
+    """
+    Parses the region argument of the describe commands. The argument may hold a single region, a comma separated
+    list of regions or "All" for all the regions enabled in the account.
+
+    :return: The list of the regions to describe, or None for a single region (the default region if not specified).
+    """
+    regions = argToList(region_arg)
+    if any(region.lower() == 'all' for region in regions):
+        client = aws_client.aws_session(service='ec2', **session_kwargs)
+        return [region['RegionName'] for region in client.describe_regions()['Regions']]
+    if len(regions) > 1:
+        # keeps the order of the regions and drops duplicates
+        return [region for i, region in enumerate(regions) if region not in regions[:i]]
+    return None
+
+
+def describe_in_regions(args, aws_client, describe_region, context_path, title, no_results_message=None):
+    """
+    Runs a describe function in the regions of the region argument and returns its results.
+    When several regions are given they are described concurrently and their results are merged, regions which
+    failed are listed in the human readable output.
+
+    :param describe_region: A function which gets the command args and a client of a region and returns the table rows
+        and the raw context of the region, or None if nothing was found.
+    """
+    session_kwargs = {
+        'role_arn': args.get('roleArn'),
+        'role_session_name': args.get('roleSessionName'),
+        'role_session_duration': args.get('roleSessionDuration')
+    }
+    regions = get_regions(args.get('region'), aws_client, session_kwargs)
+    if regions is None:
+        client = aws_client.aws_session(service='ec2', region=args.get('region'), **session_kwargs)
+        results, errors = [(args.get('region'), describe_region(args, client))], []
+    else:
+        max_workers = int(demisto.params().get('max_concurrent_regions') or AWS_MAX_CONCURRENT_REGIONS)
+        results, errors = aws_client.run_in_regions('ec2', regions, lambda client: describe_region(args, client),
+                                                    max_workers=max_workers, **session_kwargs)
+        if errors and not results:
+            raise errors[0][1]
+
+    data = []
+    raw = []
+    for _, result in results:
+        if result:
+            data.extend(result[0])
+            raw.extend(result[1])
+
+    if no_results_message and not any(result for _, result in results) and not errors:
+        demisto.results(no_results_message)
+        return
+
+    human_readable = tableToMarkdown(title, data)
+    if errors:
+        human_readable += tableToMarkdown('Failed Regions', [{'Region': region, 'Error': str(error)}
+                                                             for region, error in errors], headers=['Region', 'Error'])
+    return_outputs(human_readable, {context_path: raw})
+
+
 """MAIN FUNCTIONS"""
 
 
@@ -104,14 +164,7 @@ def describe_regions_command(args, aws_client):
     return_outputs(human_readable, ec)
 
 
-def describe_instances_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_instances(args, client):
     obj = vars(client._client_config)
     data = []
     kwargs = {}
@@ -124,8 +177,7 @@ def describe_instances_command(args, aws_client):
     response = client.describe_instances(**kwargs)
 
     if len(response['Reservations']) == 0:
-        demisto.results('No reservations were found.')
-        return
+        return None
 
     for i, reservation in enumerate(response['Reservations']):
         for instance in reservation['Instances']:
@@ -159,19 +211,16 @@ def describe_instances_command(args, aws_client):
         raw = json.loads(json.dumps(output, cls=DatetimeEncoder))
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.Instances(val.InstanceId === obj.InstanceId)': raw}
-    human_readable = tableToMarkdown('AWS Instances', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_images_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_instances_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_instances, 'AWS.EC2.Instances(val.InstanceId === obj.InstanceId)',
+                        'AWS Instances',
+                        no_results_message='No reservations were found.')
+
+
+def describe_images(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -188,8 +237,7 @@ def describe_images_command(args, aws_client):
     response = client.describe_images(**kwargs)
 
     if len(response['Images']) == 0:
-        demisto.results('No images were found.')
-        return
+        return None
 
     for i, image in enumerate(response['Images']):
         data.append({
@@ -216,20 +264,16 @@ def describe_images_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.Images(val.ImageId === obj.ImageId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 Images', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_addresses_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_images_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_images, 'AWS.EC2.Images(val.ImageId === obj.ImageId)',
+                        'AWS EC2 Images',
+                        no_results_message='No images were found.')
+
 
+def describe_addresses(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -244,8 +288,7 @@ def describe_addresses_command(args, aws_client):
     response = client.describe_addresses(**kwargs)
 
     if len(response['Addresses']) == 0:
-        demisto.results('No addresses were found.')
-        return
+        return None
 
     for i, address in enumerate(response['Addresses']):
         data.append({
@@ -270,20 +313,16 @@ def describe_addresses_command(args, aws_client):
 
     raw = response['Addresses']
     raw[0].update({'Region': obj['_user_provided_options']['region_name']})
-    ec = {'AWS.EC2.ElasticIPs(val.AllocationId === obj.AllocationId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 ElasticIPs', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_snapshots_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_addresses_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_addresses, 'AWS.EC2.ElasticIPs(val.AllocationId === obj.AllocationId)',
+                        'AWS EC2 ElasticIPs',
+                        no_results_message='No addresses were found.')
+
 
+def describe_snapshots(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -300,8 +339,7 @@ def describe_snapshots_command(args, aws_client):
     response = client.describe_snapshots(**kwargs)
 
     if len(response['Snapshots']) == 0:
-        demisto.results('No snapshots were found.')
-        return
+        return None
 
     for i, snapshot in enumerate(response['Snapshots']):
         try:
@@ -332,20 +370,16 @@ def describe_snapshots_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.Snapshots(val.SnapshotId === obj.SnapshotId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 Snapshots', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_volumes_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_snapshots_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_snapshots, 'AWS.EC2.Snapshots(val.SnapshotId === obj.SnapshotId)',
+                        'AWS EC2 Snapshots',
+                        no_results_message='No snapshots were found.')
 
+
+def describe_volumes(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -358,8 +392,7 @@ def describe_volumes_command(args, aws_client):
     response = client.describe_volumes(**kwargs)
 
     if len(response['Volumes']) == 0:
-        demisto.results('No EC2 volumes were found.')
-        return
+        return None
 
     for i, volume in enumerate(response['Volumes']):
         try:
@@ -385,20 +418,16 @@ def describe_volumes_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.Volumes(val.VolumeId === obj.VolumeId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 Volumes', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_launch_templates_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_volumes_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_volumes, 'AWS.EC2.Volumes(val.VolumeId === obj.VolumeId)',
+                        'AWS EC2 Volumes',
+                        no_results_message='No EC2 volumes were found.')
 
+
+def describe_launch_templates(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -413,8 +442,7 @@ def describe_launch_templates_command(args, aws_client):
     response = client.describe_launch_templates(**kwargs)
 
     if len(response['LaunchTemplates']) == 0:
-        demisto.results('No launch templates were found.')
-        return
+        return None
 
     for i, template in enumerate(response['LaunchTemplates']):
         try:
@@ -443,20 +471,16 @@ def describe_launch_templates_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.LaunchTemplates(val.LaunchTemplateId === obj.LaunchTemplateId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 LaunchTemplates', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_key_pairs_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_launch_templates_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_launch_templates,
+                        'AWS.EC2.LaunchTemplates(val.LaunchTemplateId === obj.LaunchTemplateId)', 'AWS EC2 LaunchTemplates',
+                        no_results_message='No launch templates were found.')
 
+
+def describe_key_pairs(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -475,20 +499,15 @@ def describe_key_pairs_command(args, aws_client):
             'Region': obj['_user_provided_options']['region_name'],
         })
 
-    ec = {'AWS.EC2.KeyPairs(val.KeyName === obj.KeyName)': data}
-    human_readable = tableToMarkdown('AWS EC2 Key Pairs', data)
-    return_outputs(human_readable, ec)
+    return data, data
 
 
-def describe_vpcs_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_key_pairs_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_key_pairs, 'AWS.EC2.KeyPairs(val.KeyName === obj.KeyName)',
+                        'AWS EC2 Key Pairs')
 
+
+def describe_vpcs(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -501,8 +520,7 @@ def describe_vpcs_command(args, aws_client):
     response = client.describe_vpcs(**kwargs)
 
     if len(response['Vpcs']) == 0:
-        demisto.results('No VPCs were found.')
-        return
+        return None
 
     for i, vpc in enumerate(response['Vpcs']):
         data.append({
@@ -527,20 +545,16 @@ def describe_vpcs_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.Vpcs(val.VpcId === obj.VpcId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 Vpcs', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_subnets_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_vpcs_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_vpcs, 'AWS.EC2.Vpcs(val.VpcId === obj.VpcId)',
+                        'AWS EC2 Vpcs',
+                        no_results_message='No VPCs were found.')
 
+
+def describe_subnets(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -553,8 +567,7 @@ def describe_subnets_command(args, aws_client):
     response = client.describe_subnets(**kwargs)
 
     if len(response['Subnets']) == 0:
-        demisto.results('No Subnets were found.')
-        return
+        return None
 
     for i, subnet in enumerate(response['Subnets']):
         data.append({
@@ -580,20 +593,16 @@ def describe_subnets_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.Subnets(val.SubnetId === obj.SubnetId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 Subnets', data)
-    return_outputs(human_readable, ec)
+    return data, raw
 
 
-def describe_security_groups_command(args, aws_client):
-    client = aws_client.aws_session(
-        service='ec2',
-        region=args.get('region'),
-        role_arn=args.get('roleArn'),
-        role_session_name=args.get('roleSessionName'),
-        role_session_duration=args.get('roleSessionDuration')
-    )
+def describe_subnets_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_subnets, 'AWS.EC2.Subnets(val.SubnetId === obj.SubnetId)',
+                        'AWS EC2 Subnets',
+                        no_results_message='No Subnets were found.')
 
+
+def describe_security_groups(args, client):
     obj = vars(client._client_config)
     kwargs = {}
     data = []
@@ -608,8 +617,7 @@ def describe_security_groups_command(args, aws_client):
     response = client.describe_security_groups(**kwargs)
 
     if len(response['SecurityGroups']) == 0:
-        demisto.results('No security groups were found.')
-        return
+        return None
 
     for i, sg in enumerate(response['SecurityGroups']):
         data.append({
@@ -633,9 +641,13 @@ def describe_security_groups_command(args, aws_client):
         raw[0].update({'Region': obj['_user_provided_options']['region_name']})
     except ValueError as e:
         return_error('Could not decode/encode the raw response - {err_msg}'.format(err_msg=e))
-    ec = {'AWS.EC2.SecurityGroups(val.GroupId === obj.GroupId)': raw}
-    human_readable = tableToMarkdown('AWS EC2 SecurityGroups', data)
-    return_outputs(human_readable, ec)
+    return data, raw
+
+
+def describe_security_groups_command(args, aws_client):
+    describe_in_regions(args, aws_client, describe_security_groups, 'AWS.EC2.SecurityGroups(val.GroupId === obj.GroupId)',
+                        'AWS EC2 SecurityGroups',
+                        no_results_message='No security groups were found.')
 
 
 def allocate_address_command(args, aws_client):
@@ -2,6 +2,12 @@ from CommonServerPython import *
 from CommonServerUserPython import *
 import boto3
 from botocore.config import Config
+from multiprocessing.pool import ThreadPool
+
+# assumed role credentials which expire within this period are renewed
+AWS_CREDENTIALS_EXPIRY_BUFFER = timedelta(minutes=5)
+# the default number of regions which run_in_regions runs concurrently
+AWS_MAX_CONCURRENT_REGIONS = 10
 
 
 def validate_params(aws_default_region, aws_role_arn, aws_role_session_name, aws_access_key_id, aws_secret_access_key):
@@ -43,6 +49,10 @@ class AWSClient:
             ),
             proxies=proxies
         )
+        self.command_config = {}  # type: dict
+        # reused across calls to aws_session, e.g. by commands which iterate over regions
+        self.assumed_role_credentials = {}  # type: dict
+        self.clients = {}  # type: dict
 
     def update_config(self):
         command_config = {}
@@ -54,9 +64,10 @@ class AWSClient:
             (read_timeout, connect_timeout) = AWSClient.get_timeout(timeout)
             command_config['read_timeout'] = read_timeout
             command_config['connect_timeout'] = connect_timeout
-        if retries or timeout:
+        if (retries or timeout) and command_config != self.command_config:
             demisto.debug('Merging client config settings: {}'.format(command_config))
             self.config = self.config.merge(Config(**command_config))
+            self.command_config = command_config
 
     def aws_session(self, service, region=None, role_arn=None, role_session_name=None, role_session_duration=None,
                     role_policy=None):
@@ -86,57 +97,123 @@ class AWSClient:
             kwargs.update({'Policy': self.aws_role_policy})
 
         if kwargs and not self.aws_access_key_id:  # login with Role ARN
-
-            if not self.aws_access_key_id:
-                sts_client = boto3.client('sts', config=self.config, verify=self.verify_certificate,
-                                          region_name=self.aws_default_region)
-                sts_response = sts_client.assume_role(**kwargs)
-                client = boto3.client(
-                    service_name=service,
-                    region_name=region if region else self.aws_default_region,
-                    aws_access_key_id=sts_response['Credentials']['AccessKeyId'],
-                    aws_secret_access_key=sts_response['Credentials']['SecretAccessKey'],
-                    aws_session_token=sts_response['Credentials']['SessionToken'],
-                    verify=self.verify_certificate,
-                    config=self.config
-                )
-        elif self.aws_access_key_id and self.aws_role_arn:  # login with Access Key ID and Role ARN
-            sts_client = boto3.client(
-                service_name='sts',
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
+            credentials = self.assume_role(kwargs, region_name=self.aws_default_region)
+            client = self.get_client(
+                service,
+                region if region else self.aws_default_region,
+                aws_access_key_id=credentials['AccessKeyId'],
+                aws_secret_access_key=credentials['SecretAccessKey'],
+                aws_session_token=credentials['SessionToken'],
                 verify=self.verify_certificate,
                 config=self.config
             )
+        elif self.aws_access_key_id and self.aws_role_arn:  # login with Access Key ID and Role ARN
             kwargs.update({
                 'RoleArn': self.aws_role_arn,
                 'RoleSessionName': self.aws_role_session_name,
             })
-            sts_response = sts_client.assume_role(**kwargs)
-            client = boto3.client(
-                service_name=service,
-                region_name=self.aws_default_region,
-                aws_access_key_id=sts_response['Credentials']['AccessKeyId'],
-                aws_secret_access_key=sts_response['Credentials']['SecretAccessKey'],
-                aws_session_token=sts_response['Credentials']['SessionToken'],
+            credentials = self.assume_role(kwargs, aws_access_key_id=self.aws_access_key_id,
+                                           aws_secret_access_key=self.aws_secret_access_key)
+            client = self.get_client(
+                service,
+                self.aws_default_region,
+                aws_access_key_id=credentials['AccessKeyId'],
+                aws_secret_access_key=credentials['SecretAccessKey'],
+                aws_session_token=credentials['SessionToken'],
                 verify=self.verify_certificate,
                 config=self.config
             )
         elif self.aws_access_key_id and not self.aws_role_arn:  # login with access key id
-            client = boto3.client(
-                service_name=service,
-                region_name=region if region else self.aws_default_region,
+            client = self.get_client(
+                service,
+                region if region else self.aws_default_region,
                 aws_access_key_id=self.aws_access_key_id,
                 aws_secret_access_key=self.aws_secret_access_key,
                 verify=self.verify_certificate,
                 config=self.config
             )
         else:  # login with default permissions, permissions pulled from the ec2 metadata
-            client = boto3.client(service_name=service,
-                                  region_name=region if region else self.aws_default_region)
+            client = self.get_client(service, region if region else self.aws_default_region)
 
         return client
 
+    def assume_role(self, assume_role_kwargs, **sts_client_kwargs):
+        """
+        Assumes a role with STS. The credentials are cached by the assume role arguments (role ARN, session name,
+        duration and policy) and reused until they are about to expire.
+
+        :param assume_role_kwargs: The arguments of the STS assume_role call.
+        :param sts_client_kwargs: The region and credentials arguments of the STS client.
+        :return: The temporary credentials of the role.
+        """
+        cache_key = (sts_client_kwargs.get('aws_access_key_id'), tuple(sorted(assume_role_kwargs.items())))
+        credentials = self.assumed_role_credentials.get(cache_key)
+        if credentials:
+            expiration = credentials.get('Expiration')
+            if not isinstance(expiration, datetime) or \
+                    datetime.now(expiration.tzinfo) < expiration - AWS_CREDENTIALS_EXPIRY_BUFFER:
+                return credentials
+
+        sts_client = self.get_client('sts', sts_client_kwargs.pop('region_name', None), config=self.config,
+                                     verify=self.verify_certificate, **sts_client_kwargs)
+        credentials = sts_client.assume_role(**assume_role_kwargs)['Credentials']
+        self.assumed_role_credentials[cache_key] = credentials
+        return credentials
+
+    def get_client(self, service, region, **client_kwargs):
+        """
+        Gets a boto3 client of the service in the region, reusing a client created earlier with the same arguments.
+
+        :param service: The AWS service name, for example ec2.
+        :param region: The AWS region name.
+        :param client_kwargs: The rest of the boto3 client arguments (credentials, verify and config).
+        :return: The boto3 client.
+        """
+        cache_key = (service, region, tuple(sorted(client_kwargs.items())))
+        if cache_key not in self.clients:
+            self.clients[cache_key] = boto3.client(service_name=service, region_name=region, **client_kwargs)
+        return self.clients[cache_key]
+
+    def run_in_regions(self, service, regions, func, max_workers=AWS_MAX_CONCURRENT_REGIONS, **session_kwargs):
+        """
+        Runs a function with a client of the service in each of the regions, in a pool of threads.
+        The clients are created before the threads are started, as creating boto3 clients is not thread safe.
+
+        :param service: The AWS service name, for example ec2.
+        :param regions: The AWS region names.
+        :param func: A function which gets the client of a region.
+        :param max_workers: The maximal number of regions to run concurrently.
+        :param session_kwargs: The rest of the aws_session arguments (role ARN, session name and duration).
+        :return: A list of (region, result) of the regions which succeeded and a list of (region, exception) of the
+            regions which failed, both in the order of the given regions.
+        """
+        outcomes = {}
+        region_clients = []
+        for region in regions:
+            try:
+                region_clients.append((region, self.aws_session(service, region=region, **session_kwargs)))
+            except Exception as e:
+                outcomes[region] = (None, e)
+
+        def run(region_client):
+            region, client = region_client
+            try:
+                return region, (func(client), None)
+            except (Exception, SystemExit) as e:  # return_error exits
+                return region, (None, e)
+
+        if region_clients:
+            pool = ThreadPool(max(1, min(int(max_workers), len(region_clients))))
+            try:
+                outcomes.update(pool.map(run, region_clients))
+            finally:
+                pool.close()
+                pool.join()
+
+        results = [(region, outcomes[region][0]) for region in regions if outcomes[region][1] is None]
+        errors = [(region, outcomes[region][1]) for region in regions if outcomes[region][1] is not None]
+        return results, errors
+
     @staticmethod
     def get_timeout(timeout):
         if not timeout:
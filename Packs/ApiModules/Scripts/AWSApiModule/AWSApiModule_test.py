@@ -98,3 +98,107 @@ def test_get_timeout():
     assert read == 100 and connect == 10
     (read, connect) = AWSClient.get_timeout("200,2")
     assert read == 200 and connect == 2
+
+
+def create_client(aws_role_arn=None, aws_role_session_name=None, aws_access_key_id=None, aws_secret_access_key=None):
+    return AWSClient(aws_default_region='us-east-1', aws_role_arn=aws_role_arn,
+                     aws_role_session_name=aws_role_session_name, aws_role_session_duration=None,
+                     aws_role_policy=None, aws_access_key_id=aws_access_key_id,
+                     aws_secret_access_key=aws_secret_access_key, verify_certificate=False, timeout=None, retries=5)
+
+
+class STSClientMock:
+    def __init__(self, expiration=None):
+        self.expiration = expiration
+        self.assume_role_calls = []
+
+    def assume_role(self, **kwargs):
+        self.assume_role_calls.append(kwargs)
+        return {'Credentials': {'AccessKeyId': 'access_key', 'SecretAccessKey': 'secret_key',
+                                'SessionToken': 'token{}'.format(len(self.assume_role_calls)),
+                                'Expiration': self.expiration}}
+
+
+def test_aws_session_reuses_credentials_and_clients(mocker):
+    """
+    Given
+    - An instance configured with a role ARN
+    When
+    - Creating sessions of a service in several regions, and again in the same regions
+    Then
+    - Validates that the role is assumed once, and a single client is created per service and region
+    """
+    sts_client = STSClientMock(expiration=datetime.now(timezone.utc) + timedelta(hours=1))
+    boto3_client = mocker.patch.object(boto3, 'client',
+                                       side_effect=lambda service_name, **kwargs: sts_client
+                                       if service_name == 'sts' else object())
+    client = create_client(aws_role_arn='role_arn', aws_role_session_name='session')
+
+    first_clients = [client.aws_session('ec2', region) for region in ('us-east-1', 'eu-west-1')]
+    second_clients = [client.aws_session('ec2', region) for region in ('us-east-1', 'eu-west-1')]
+
+    assert first_clients == second_clients
+    assert first_clients[0] is not first_clients[1]
+    assert len(sts_client.assume_role_calls) == 1
+    assert boto3_client.call_count == 3  # sts and one ec2 client per region
+
+    # a different role is assumed separately
+    client.aws_session('ec2', 'us-east-1', role_arn='other_role_arn', role_session_name='session')
+    assert len(sts_client.assume_role_calls) == 2
+
+
+@pytest.mark.parametrize('expires_in, assume_role_calls', [
+    (timedelta(minutes=1), 2),
+    (timedelta(hours=1), 1),
+])
+def test_aws_session_renews_expiring_credentials(mocker, expires_in, assume_role_calls):
+    """
+    Given
+    - 1. Assumed role credentials which expire in a minute
+    - 2. Assumed role credentials which expire in an hour
+    When
+    - Creating a second session with the same role
+    Then
+    - 1. Validates that the role is assumed again
+    - 2. Validates that the cached credentials are used
+    """
+    sts_client = STSClientMock(expiration=datetime.now(timezone.utc) + expires_in)
+    mocker.patch.object(boto3, 'client', side_effect=lambda service_name, **kwargs: sts_client
+                        if service_name == 'sts' else object())
+    client = create_client(aws_role_arn='role_arn', aws_role_session_name='session')
+
+    client.aws_session('ec2')
+    client.aws_session('ec2')
+
+    assert len(sts_client.assume_role_calls) == assume_role_calls
+
+
+class RegionClientMock:
+    def __init__(self, region_name):
+        self.region_name = region_name
+
+    def describe(self):
+        if self.region_name == 'eu-west-1':
+            raise DemistoException('Access denied')
+        return self.region_name.upper()
+
+
+def test_run_in_regions(mocker):
+    """
+    Given
+    - Three regions, where the call in one of them fails
+    When
+    - Running the call in the regions
+    Then
+    - Validates that the results and the errors are returned in the order of the regions
+    """
+    mocker.patch.object(boto3, 'client', side_effect=lambda service_name, region_name, **kwargs:
+                        RegionClientMock(region_name))
+    client = create_client()
+
+    results, errors = client.run_in_regions('ec2', ['us-east-1', 'eu-west-1', 'us-west-2'],
+                                            lambda region_client: region_client.describe(), max_workers=2)
+
+    assert results == [('us-east-1', 'US-EAST-1'), ('us-west-2', 'US-WEST-2')]
+    assert [region for region, _ in errors] == ['eu-west-1']
+    assert str(errors[0][1]) == 'Access denied'
@@ -3,16 +3,27 @@ from CommonServerPython import *
 from CommonServerUserPython import *
 
 ''' IMPORTS '''
+import concurrent.futures
 import csv
-import gzip
+import codecs
+import hashlib
+import tempfile
+import zlib
 import urllib3
+from itertools import islice
 from dateutil.parser import parse
-from typing import Optional, Pattern, Dict, Any, Tuple, Union, List
+from typing import Optional, Pattern, Dict, Any, Tuple, Union, List, Iterable, Iterator, Callable
 
 # disable insecure warnings
 urllib3.disable_warnings()
 
 # Globals
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read from the feed response at a time
+CREATE_INDICATORS_BATCH_SIZE = 2000
+MAX_CONCURRENT_REQUESTS = 10
+SPOOLED_FEED_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # feeds which are downloaded concurrently and are larger go to disk
+FEED_VALIDATORS_CONTEXT_KEY = 'feed_validators'
+GZIP_WBITS = 16 + zlib.MAX_WBITS  # tells zlib to expect a gzip header and trailer
 
 
 class Client(BaseClient):
@@ -20,7 +31,8 @@ class Client(BaseClient):
                  insecure: bool = False, credentials: dict = None, ignore_regex: str = None, encoding: str = 'latin-1',
                  delimiter: str = ',', doublequote: bool = True, escapechar: str = '',
                  quotechar: str = '"', skipinitialspace: bool = False, polling_timeout: int = 20, proxy: bool = False,
-                 feedTags: Optional[str] = None, tlp_color: Optional[str] = None, value_field: str = 'value', **kwargs):
+                 feedTags: Optional[str] = None, tlp_color: Optional[str] = None, value_field: str = 'value',
+                 max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS, skip_unchanged: bool = False, **kwargs):
         """
         :param url: URL of the feed.
         :param feed_url_to_config: for each URL, a configuration of the feed that contains
@@ -65,6 +77,10 @@ class Client(BaseClient):
         :param polling_timeout: timeout of the polling request in seconds. Default: 20
         :param proxy: Sets whether use proxy when sending requests
         :param tlp_color: Traffic Light Protocol color.
+        :param max_concurrent_requests: The maximal number of feed URLs which are downloaded concurrently. Default: 10
+        :param skip_unchanged: If *true* the feeds are fetched with conditional requests (using the ETag and
+            Last-Modified headers of their last fetch, or the hash of their content if the server does not return
+            these headers), and feeds which have not changed since their last fetch are skipped. Default: *false*
         """
         self.tags: List[str] = argToList(feedTags)
         self.tlp_color = tlp_color
@@ -105,6 +121,20 @@ class Client(BaseClient):
             'quotechar': quotechar,
             'skipinitialspace': skipinitialspace
         }
+        try:
+            self.max_concurrent_requests = max(int(max_concurrent_requests), 1)
+        except (ValueError, TypeError):
+            return_error('Please provide an integer value for "Maximal concurrent requests"')
+        # all the feed URLs are fetched through a single session, whose connection pool is big enough to serve
+        # all the concurrent requests
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrent_requests)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self.skip_unchanged = argToBoolean(skip_unchanged)
+        # the validators of the last fetch of each feed URL, and the ones of the current fetch
+        self.feed_validators: Dict[str, dict] = {}
+        self.new_feed_validators: Dict[str, dict] = {}
 
     def _build_request(self, url):
         r = requests.Request(
@@ -120,59 +150,28 @@ class Client(BaseClient):
         urls = self._base_url
         if not isinstance(urls, list):
             urls = [urls]
-        for url in urls:
-            _session = requests.Session()
-
-            prepreq = self._build_request(url)
-
-            # this is to honour the proxy environment variables
-            kwargs.update(_session.merge_environment_settings(
-                prepreq.url,
-                {}, None, None, None  # defaults
-            ))
-            kwargs['stream'] = True
-            kwargs['verify'] = self._verify
-            kwargs['timeout'] = self.polling_timeout
-
-            if self.headers:
-                if 'headers' in kwargs:
-                    kwargs['headers'].update(self.headers)
-                else:
-                    kwargs['headers'] = self.headers
-
-            try:
-                r = _session.send(prepreq, **kwargs)
-            except requests.exceptions.ConnectTimeout as exception:
-                err_msg = 'Connection Timeout Error - potential reasons might be that the Server URL parameter' \
-                          ' is incorrect or that the Server is not accessible from your host.'
-                raise DemistoException(err_msg, exception)
-            except requests.exceptions.SSLError as exception:
-                # in case the "Trust any certificate" is already checked
-                if not self._verify:
-                    raise
-                err_msg = 'SSL Certificate Verification Failed - try selecting \'Trust any certificate\' checkbox in' \
-                          ' the integration configuration.'
-                raise DemistoException(err_msg, exception)
-            except requests.exceptions.ProxyError as exception:
-                err_msg = 'Proxy Error - if the \'Use system proxy\' checkbox in the integration configuration is' \
-                          ' selected, try clearing the checkbox.'
-                raise DemistoException(err_msg, exception)
-            except requests.exceptions.ConnectionError as exception:
-                # Get originating Exception in Exception chain
-                error_class = str(exception.__class__)
-                err_type = '<' + error_class[error_class.find('\'') + 1: error_class.rfind('\'')] + '>'
-                err_msg = 'Verify that the server URL parameter' \
-                          ' is correct and that you have access to the server from your host.' \
-                          '\nError Type: {}\nError Number: [{}]\nMessage: {}\n' \
-                    .format(err_type, exception.errno, exception.strerror)
-                raise DemistoException(err_msg, exception)
-            try:
-                r.raise_for_status()
-            except Exception:
-                return_error('Exception in request: {} {}'.format(r.status_code, r.content))
-                raise
+        if self.skip_unchanged:
+            self.feed_validators = get_integration_context().get(FEED_VALIDATORS_CONTEXT_KEY, {})
+        if self.skip_unchanged or (len(urls) > 1 and self.max_concurrent_requests > 1):
+            # the feeds are downloaded concurrently (each one with its own timeout) to temporary files, which keeps
+            # the memory usage bounded, and are parsed from these files in the order of the URLs. An error in any of
+            # the URLs is raised only after all of them were done. Feeds are also downloaded (rather than streamed)
+            # when skipping unchanged feeds, as their content hash is known only after downloading them.
+            max_workers = min(self.max_concurrent_requests, len(urls))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self.download_feed, url, **kwargs) for url in urls]
+                concurrent.futures.wait(futures)
+            feed_files = [(url, future.result()) for url, future in zip(urls, futures)]
+            # unchanged feeds are not downloaded
+            urls = [url for url, feed_file in feed_files if feed_file is not None]
+            feeds_lines: Iterable[Iterator[str]] = [
+                self.iter_content_lines(url, iter_file_chunks(feed_file))
+                for url, feed_file in feed_files if feed_file is not None
+            ]
+        else:
+            feeds_lines = (self.iter_feed_content_lines(url, self.get_feed_response(url, **kwargs)) for url in urls)
 
-            response = self.get_feed_content_divided_to_lines(url, r)
+        for url, response in zip(urls, feeds_lines):
             if self.feed_url_to_config:
                 fieldnames = self.feed_url_to_config.get(url, {}).get('fieldnames', [])
                 skip_first_line = self.feed_url_to_config.get(url, {}).get('skip_first_line', False)
@@ -198,6 +197,143 @@ class Client(BaseClient):
 
         return results
 
+    def get_feed_response(self, url, **kwargs):
+        """Sends the request for the feed of a single URL. The content of the feed is not read.
+
+        Args:
+            url: The feed's url.
+
+        Returns:
+            requests.Response. The (streamed) response of the feed's url.
+        """
+        prepreq = self._build_request(url)
+
+        # this is to honour the proxy environment variables
+        kwargs.update(self._session.merge_environment_settings(
+            prepreq.url,
+            {}, None, None, None  # defaults
+        ))
+        kwargs['stream'] = True
+        kwargs['verify'] = self._verify
+        kwargs['timeout'] = self.polling_timeout
+
+        if self.headers:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **self.headers)
+        if self.skip_unchanged:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **self.get_conditional_headers(url))
+
+        try:
+            r = self._session.send(prepreq, **kwargs)
+        except requests.exceptions.ConnectTimeout as exception:
+            err_msg = 'Connection Timeout Error - potential reasons might be that the Server URL parameter' \
+                      ' is incorrect or that the Server is not accessible from your host.'
+            raise DemistoException(err_msg, exception)
+        except requests.exceptions.SSLError as exception:
+            # in case the "Trust any certificate" is already checked
+            if not self._verify:
+                raise
+            err_msg = 'SSL Certificate Verification Failed - try selecting \'Trust any certificate\' checkbox in' \
+                      ' the integration configuration.'
+            raise DemistoException(err_msg, exception)
+        except requests.exceptions.ProxyError as exception:
+            err_msg = 'Proxy Error - if the \'Use system proxy\' checkbox in the integration configuration is' \
+                      ' selected, try clearing the checkbox.'
+            raise DemistoException(err_msg, exception)
+        except requests.exceptions.ConnectionError as exception:
+            # Get originating Exception in Exception chain
+            error_class = str(exception.__class__)
+            err_type = '<' + error_class[error_class.find('\'') + 1: error_class.rfind('\'')] + '>'
+            err_msg = 'Verify that the server URL parameter' \
+                      ' is correct and that you have access to the server from your host.' \
+                      '\nError Type: {}\nError Number: [{}]\nMessage: {}\n' \
+                .format(err_type, exception.errno, exception.strerror)
+            raise DemistoException(err_msg, exception)
+        try:
+            r.raise_for_status()
+        except Exception:
+            return_error('Exception in request: {} {}'.format(r.status_code, r.content))
+            raise
+
+        return r
+
+    def download_feed(self, url, **kwargs):
+        """Downloads the feed of a single URL to a temporary file, which is kept in memory only for small feeds.
+
+        Args:
+            url: The feed's url.
+
+        Returns:
+            SpooledTemporaryFile. The (raw) content of the feed, or None if skipping unchanged feeds and the feed has
+            not changed.
+        """
+        response = self.get_feed_response(url, **kwargs)
+        if self.skip_unchanged and response.status_code == 304:
+            demisto.debug(f'{url} has not changed since the last fetch, skipping it')
+            return None
+
+        feed_file = tempfile.SpooledTemporaryFile(max_size=SPOOLED_FEED_MAX_MEMORY_SIZE)
+        content_hash = hashlib.sha256()
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            feed_file.write(chunk)
+            content_hash.update(chunk)
+        feed_file.seek(0)
+
+        if self.skip_unchanged and self.is_feed_unchanged(url, response, content_hash.hexdigest):
+            demisto.debug(f'{url} has not changed since the last fetch, skipping it')
+            feed_file.close()
+            return None
+        return feed_file
+
+    def get_conditional_headers(self, url):
+        """Builds the headers of a conditional request for a feed, from the validators of its last fetch.
+
+        Args:
+            url: The feed's url.
+
+        Returns:
+            dict. The conditional request headers.
+        """
+        validators = self.feed_validators.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def is_feed_unchanged(self, url, response, get_content_hash: Callable[[], str]) -> bool:
+        """Checks whether a feed has not changed since its last fetch, according to the response status code and
+        validators (ETag and Last-Modified headers), or the hash of its content if the server does not return
+        validators. The validators of the response are kept, to be saved once the fetch is done.
+
+        Args:
+            url: The feed's url.
+            response: The feed's response.
+            get_content_hash: Function which returns the hash of the feed's content.
+
+        Returns:
+            bool. True if the feed has not changed.
+        """
+        if response.status_code == 304:
+            return True
+        validators = assign_params(etag=response.headers.get('ETag'),
+                                   last_modified=response.headers.get('Last-Modified'))
+        if not validators:
+            validators = {'content_hash': get_content_hash()}
+        self.new_feed_validators[url] = validators
+        return validators == self.feed_validators.get(url)
+
+    def save_feed_validators(self):
+        """Saves the validators of the fetched feeds to the integration context. Should be called only once the
+        indicators of the feeds were created, so that feeds which failed to be processed are not skipped later on.
+        """
+        if self.new_feed_validators:
+            integration_context = get_integration_context()
+            integration_context[FEED_VALIDATORS_CONTEXT_KEY] = dict(
+                integration_context.get(FEED_VALIDATORS_CONTEXT_KEY, {}), **self.new_feed_validators)
+            set_integration_context(integration_context)
+            self.new_feed_validators = {}
+
     def get_feed_content_divided_to_lines(self, url, raw_response):
         """Fetch feed data and divides its content to lines
 
@@ -208,12 +344,86 @@ class Client(BaseClient):
         Returns:
             List. List of lines from the feed content.
         """
-        if self.feed_url_to_config and self.feed_url_to_config.get(url).get('is_zipped_file'):  # type: ignore
-            response_content = gzip.decompress(raw_response.content)
-        else:
-            response_content = raw_response.content
+        return list(self.iter_feed_content_lines(url, raw_response))
+
+    def iter_feed_content_lines(self, url, raw_response):
+        """Lazily reads the feed content and yields it line by line.
+
+        Args:
+            url: Current feed's url.
+            raw_response: The raw response from the feed's url.
+
+        Returns:
+            Iterator. The lines of the feed content, split exactly as ``content.split('\\n')`` would.
+        """
+        return self.iter_content_lines(url, raw_response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+    def iter_content_lines(self, url, chunks: Iterable[bytes]):
+        """Yields the lines of a feed's raw content.
+
+        The content is gunzipped (if the feed is zipped) and decoded incrementally, so only a single chunk of the feed
+        is held in memory at any time.
+
+        Args:
+            url: Current feed's url.
+            chunks: The raw content of the feed, chunk by chunk.
+
+        Returns:
+            Iterator. The lines of the feed content.
+        """
+        if self.feed_url_to_config and self.feed_url_to_config.get(url, {}).get('is_zipped_file'):
+            chunks = iter_gunzip(chunks)
+
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        pending = ''
+        for chunk in chunks:
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            pending = lines.pop()
+            yield from lines
+
+        yield from (pending + decoder.decode(b'', final=True)).split('\n')
+
+
+def iter_file_chunks(file_obj) -> Iterator[bytes]:
+    """Reads a file chunk by chunk, from its current position."""
+    yield from iter(lambda: file_obj.read(STREAM_CHUNK_SIZE), b'')
+
+
+def iter_gunzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Incrementally decompresses a gzip stream (including multi-member gzip files).
+
+    Args:
+        chunks: The compressed stream, chunk by chunk.
+
+    Returns:
+        Iterator. The decompressed stream, chunk by chunk.
+    """
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    for chunk in chunks:
+        while chunk:
+            yield decompressor.decompress(chunk)
+            chunk = decompressor.unused_data
+            if decompressor.eof:
+                # a new gzip member starts right after the end of the current one
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+    yield decompressor.flush()
+
 
-        return response_content.decode(self.encoding).split('\n')
+def batch_iterable(iterable: Iterable, batch_size: int) -> Iterator[list]:
+    """Splits an iterable (e.g. a generator) to lists of at most `batch_size` items, without materializing it.
+
+    Args:
+        iterable: The iterable to split.
+        batch_size: The maximal size of each batch.
+
+    Returns:
+        Iterator. Lists of consecutive items of the iterable.
+    """
+    iterator = iter(iterable)
+    current_batch = list(islice(iterator, batch_size))
+    while current_batch:
+        yield current_batch
+        current_batch = list(islice(iterator, batch_size))
 
 
 def determine_indicator_type(indicator_type, default_indicator_type, auto_detect, value):
@@ -292,9 +502,30 @@ def create_fields_mapping(raw_json: Dict[str, Any], mapping: Dict[str, Union[Tup
 
 def fetch_indicators_command(client: Client, default_indicator_type: str, auto_detect: bool, limit: int = 0,
                              create_relationships: bool = False, **kwargs):
+    indicators = generate_indicators(client, default_indicator_type, auto_detect, create_relationships, **kwargs)
+    if limit:
+        # stop reading the feeds once we have enough indicators
+        indicators = islice(indicators, int(limit))
+    return list(indicators)
+
+
+def generate_indicators(client: Client, default_indicator_type: str, auto_detect: bool,
+                        create_relationships: bool = False, **kwargs) -> Iterator[dict]:
+    """Lazily parses the feeds and yields their indicators one by one.
+
+    The feeds are read while the indicators are consumed, so memory usage does not depend on the size of the feeds.
+
+    Args:
+        client: The CSV feed client.
+        default_indicator_type: Indicator type which was inserted as a param of the integration by user.
+        auto_detect: True whether auto detection of the indicator type is wanted.
+        create_relationships: Whether to create the indicators relationships configured for the feed.
+
+    Returns:
+        Iterator. The indicators of the feeds.
+    """
     iterator = client.build_iterator(**kwargs)
     relationships_of_indicator = []
-    indicators = []
     config = client.feed_url_to_config or {}
     for url_to_reader in iterator:
         for url, reader in url_to_reader.items():
@@ -336,12 +567,7 @@ def fetch_indicators_command(client: Client, default_indicator_type: str, auto_d
                     if client.tlp_color:
                         indicator['fields']['trafficlightprotocol'] = client.tlp_color
 
-                    indicators.append(indicator)
-                    # exit the loop if we have more indicators than the limit
-                    if limit and len(indicators) >= limit:
-                        return indicators
-
-    return indicators
+                    yield indicator
 
 
 def get_indicators_command(client, args: dict, tags: Optional[List[str]] = None):
@@ -368,6 +594,10 @@ def feed_main(feed_name, params=None, prefix=''):
     command = demisto.command()
     if command != 'fetch-indicators':
         demisto.info('Command being called is {}'.format(command))
+    # skipping a feed does not mark its indicators as seen, so with the "when removed from feed" expiration policy,
+    # all of its indicators would be expired
+    client.skip_unchanged = client.skip_unchanged and command == 'fetch-indicators' and \
+        params.get('feedExpirationPolicy') != 'suddenDeath'
     if prefix and not prefix.endswith('-'):
         prefix += '-'
     # Switch case
@@ -377,16 +607,19 @@ def feed_main(feed_name, params=None, prefix=''):
     }
     try:
         if command == 'fetch-indicators':
-            indicators = fetch_indicators_command(
+            indicators = generate_indicators(
                 client,
                 params.get('indicator_type'),
                 params.get('auto_detect_type'),
-                params.get('limit'),
                 params.get('create_relationships')
             )
-            # we submit the indicators in batches
-            for b in batch(indicators, batch_size=2000):
+            limit = params.get('limit')
+            if limit:
+                indicators = islice(indicators, int(limit))
+            # we submit the indicators in batches while the feed is still being read, to keep memory usage bounded
+            for b in batch_iterable(indicators, batch_size=CREATE_INDICATORS_BATCH_SIZE):
                 demisto.createIndicators(b)  # type: ignore
+            client.save_feed_validators()
         else:
             args = demisto.args()
             args['feed_name'] = feed_name
@@ -360,3 +360,154 @@ def test_get_indicators_without_relations():
         indicators = fetch_indicators_command(client, default_indicator_type=itype, auto_detect=False,
                                               limit=35, create_relationships=False)
         assert indicators == expected_res
+
+
+class MockStreamedResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        # tiny chunks, so that lines, multi-byte characters and gzip members are split between chunks
+        for i in range(0, len(self.content), 7):
+            yield self.content[i:i + 7]
+
+
+def test_iter_feed_content_lines_streaming():
+    """
+    Given:
+    - A plain and a zipped feed, read in small chunks
+
+    When:
+    - Reading the feed content line by line
+
+    Then:
+    - Validate the lines are the same as splitting the whole decoded content
+    """
+    with open('test_data/ip_ranges.txt', 'rb') as ip_ranges_txt:
+        ip_ranges_unzipped = ip_ranges_txt.read()
+    with open('test_data/ip_ranges.gz', 'rb') as ip_ranges_gz:
+        ip_ranges_zipped = ip_ranges_gz.read()
+    feed_url_to_config = {
+        'https://plain.com': {'content': ip_ranges_unzipped},
+        'https://zipped.com': {'content': ip_ranges_zipped, 'is_zipped_file': True},
+        'https://multi-member.com': {'content': ip_ranges_zipped + ip_ranges_zipped, 'is_zipped_file': True},
+    }
+    client = Client(url='https://plain.com', feed_url_to_config=feed_url_to_config, encoding='utf-8')
+
+    expected_output = ip_ranges_unzipped.decode('utf8').split('\n')
+    for url in ('https://plain.com', 'https://zipped.com'):
+        raw_response = MockStreamedResponse(feed_url_to_config[url]['content'])
+        assert list(client.iter_feed_content_lines(url, raw_response)) == expected_output
+
+    raw_response = MockStreamedResponse(ip_ranges_zipped + ip_ranges_zipped)
+    lines = list(client.iter_feed_content_lines('https://multi-member.com', raw_response))
+    assert lines == (ip_ranges_unzipped + ip_ranges_unzipped).decode('utf8').split('\n')
+
+    multi_byte_content = 'ééé\nאבג\n'.encode('utf-8')
+    assert list(client.iter_feed_content_lines('https://plain.com', MockStreamedResponse(multi_byte_content))) == \
+        ['ééé', 'אבג', '']
+
+
+def test_batch_iterable():
+    assert list(batch_iterable(iter(range(5)), batch_size=2)) == [[0, 1], [2, 3], [4]]
+    assert list(batch_iterable(iter([]), batch_size=2)) == []
+
+
+def test_feed_main_fetch_in_batches(mocker):
+    """
+    Given:
+    - A feed with more indicators than the createIndicators batch size and a fetch limit
+
+    When:
+    - Running fetch-indicators
+
+    Then:
+    - Validate the indicators are created in batches while the feed is read, up to the limit
+    """
+    import CSVFeedApiModule as csv_feed_module
+    with open('test_data/ip_ranges.txt') as ip_ranges_txt:
+        ip_ranges = ip_ranges_txt.read().encode('utf8')
+    params = {
+        'url': 'https://ipstack.com',
+        'feed_url_to_config': {'https://ipstack.com': {'fieldnames': ['value'], 'indicator_type': 'IP'}},
+        'indicator_type': 'IP',
+        'limit': 25,
+    }
+    mocker.patch.object(csv_feed_module, 'CREATE_INDICATORS_BATCH_SIZE', 10)
+    mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+    create_indicators = mocker.patch.object(demisto, 'createIndicators')
+
+    with requests_mock.Mocker() as m:
+        m.get('https://ipstack.com', content=ip_ranges)
+        feed_main('CSV', params=params, prefix='csv')
+
+    batch_sizes = [len(call_args[0][0]) for call_args in create_indicators.call_args_list]
+    assert batch_sizes == [10, 10, 5]
+
+
+def test_build_iterator_multiple_urls_concurrently():
+    """
+    Given:
+    - A feed with several URLs (zipped and not zipped), each of them returning different indicators
+
+    When:
+    - Fetching the feeds concurrently and sequentially
+
+    Then:
+    - Validate the same rows are returned in the order of the URLs, regardless of the concurrency
+    """
+    import gzip
+    urls = [f'https://ipstack{i}.com' for i in range(5)]
+    feed_url_to_config = {url: {'fieldnames': ['value'], 'is_zipped_file': i % 2 == 0} for i, url in enumerate(urls)}
+
+    results = []
+    with requests_mock.Mocker() as m:
+        for i, url in enumerate(urls):
+            content = f'1.1.1.{i}\n2.2.2.{i}\n'.encode('utf-8')
+            m.get(url, content=gzip.compress(content) if i % 2 == 0 else content)
+        for max_concurrent_requests in (1, 3):
+            client = Client(url=urls, feed_url_to_config=feed_url_to_config,
+                            max_concurrent_requests=max_concurrent_requests)
+            results.append([{url: [row['value'] for row in reader] for url, reader in url_to_reader.items()}
+                            for url_to_reader in client.build_iterator()])
+
+    assert results[0] == results[1] == [{url: [f'1.1.1.{i}', f'2.2.2.{i}']} for i, url in enumerate(urls)]
+
+
+def test_feed_main_skip_unchanged(mocker):
+    """
+    Given:
+    - A feed which skips unchanged feeds, served with an ETag by one URL and without validators by another
+
+    When:
+    - Running fetch-indicators twice while the feeds do not change, and once after they change
+
+    Then:
+    - Validate conditional requests are sent, and indicators are created only for feeds which changed
+    """
+    import CSVFeedApiModule as csv_feed_module
+    integration_context: dict = {}
+    mocker.patch.object(csv_feed_module, 'get_integration_context', side_effect=lambda: dict(integration_context))
+    mocker.patch.object(csv_feed_module, 'set_integration_context', side_effect=integration_context.update)
+    mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+    urls = ['https://etag.com', 'https://no-validators.com']
+    params = {
+        'url': urls,
+        'feed_url_to_config': {url: {'fieldnames': ['value'], 'indicator_type': 'IP'} for url in urls},
+        'skip_unchanged': True,
+    }
+
+    created_indicators = []
+    with requests_mock.Mocker() as m:
+        for etag_content, content in ((b'1.1.1.1', b'2.2.2.2'), (b'1.1.1.1', b'2.2.2.2'), (b'3.3.3.3', b'4.4.4.4')):
+            m.get(urls[0], content=etag_content, headers={'ETag': etag_content.decode()})
+            m.get(urls[0], request_headers={'If-None-Match': etag_content.decode()}, status_code=304)
+            m.get(urls[1], content=content)
+            create_indicators = mocker.patch.object(demisto, 'createIndicators')
+            feed_main('CSV', params=params, prefix='csv')
+            created_indicators.append([indicator['value'] for call_args in create_indicators.call_args_list
+                                       for indicator in call_args[0][0]])
+
+    assert created_indicators == [['1.1.1.1', '2.2.2.2'], [], ['3.3.3.3', '4.4.4.4']]
+    assert integration_context['feed_validators'][urls[0]] == {'etag': '3.3.3.3'}
+    assert list(integration_context['feed_validators'][urls[1]]) == ['content_hash']
@@ -1,6 +1,11 @@
 from CommonServerPython import *
 from CommonServerUserPython import *
 
+import hashlib
+
+CROWDSTRIKE_TOKEN_CONTEXT_KEY = 'crowdstrike_access_token'
+CROWDSTRIKE_TOKEN_EXPIRY_BUFFER = 60  # seconds before the token expires in which a new token is generated
+
 
 class CrowdStrikeClient(BaseClient):
 
@@ -16,7 +21,10 @@ class CrowdStrikeClient(BaseClient):
         super().__init__(base_url=demisto.params().get('server_url', 'https://api.crowdstrike.com/'),
                          verify=not params.get('insecure', False), ok_codes=tuple(),
                          proxy=params.get('proxy', False))  # type: ignore[misc]
-        self._token = self._generate_token()
+        # the cached token is used only by the instance that generated it, and not after its credentials change
+        self._token_fingerprint = hashlib.sha256(
+            f'{self._base_url}:{self._client_id}:{self._client_secret}'.encode()).hexdigest()
+        self._token = self._get_token()
         self._headers = {'Authorization': 'bearer ' + self._token}
 
     @staticmethod
@@ -41,10 +49,10 @@ class CrowdStrikeClient(BaseClient):
                 if err_msg.endswith('.'):
                     err_msg = err_msg[:-1]
                 err_msg += ') is invalid.'
-            raise DemistoException(err_msg)
+            raise DemistoException(err_msg, res=res)
         except ValueError:
             err_msg += '\n{}'.format(res.text)
-            raise DemistoException(err_msg)
+            raise DemistoException(err_msg, res=res)
 
     def http_request(self, method, url_suffix, full_url=None, headers=None, json_data=None, params=None, data=None,
                      files=None, timeout=10, ok_codes=None, return_empty_response=False, auth=None):
@@ -94,13 +102,41 @@ class CrowdStrikeClient(BaseClient):
         :return: Depends on the resp_type parameter
         :rtype: ``dict`` or ``str`` or ``requests.Response``
         """
-        return super()._http_request(method=method, url_suffix=url_suffix, full_url=full_url, headers=headers,
-                                     json_data=json_data, params=params, data=data, files=files, timeout=timeout,
-                                     ok_codes=ok_codes, return_empty_response=return_empty_response, auth=auth,
-                                     error_handler=self._error_handler)
+        request_kwargs = dict(method=method, url_suffix=url_suffix, full_url=full_url, headers=headers,
+                              json_data=json_data, params=params, data=data, files=files, timeout=timeout,
+                              ok_codes=ok_codes, return_empty_response=return_empty_response, auth=auth,
+                              error_handler=self._error_handler)
+        try:
+            return super()._http_request(**request_kwargs)
+        except DemistoException as e:
+            res = getattr(e, 'res', None)
+            # the cached token was revoked or expired, retry once with a new token
+            if res is None or res.status_code != 401 or headers is not None or url_suffix == '/oauth2/token':
+                raise
+            demisto.debug('Got unauthorized response from CrowdStrike, generating a new access token.')
+            self._token = self._get_token(force_gen_new_token=True)
+            self._headers['Authorization'] = 'bearer ' + self._token
+            return super()._http_request(**request_kwargs)
+
+    def _get_token(self, force_gen_new_token: bool = False) -> str:
+        """Gets an Access token from the integration context, or generates a new one if there is no valid token
+        :param force_gen_new_token: Whether to generate a new token even if the cached token is valid
+        :return: valid token
+        """
+        if not force_gen_new_token:
+            integration_context = get_integration_context()
+            try:
+                cached_token = json.loads(integration_context.get(CROWDSTRIKE_TOKEN_CONTEXT_KEY) or '{}')
+            except (TypeError, ValueError):
+                cached_token = {}
+            if cached_token.get('fingerprint') == self._token_fingerprint and \
+                    cached_token.get('access_token') and int(time.time()) < cached_token.get('valid_until', 0):
+                return cached_token['access_token']
+
+        return self._generate_token()
 
     def _generate_token(self) -> str:
-        """Generate an Access token using the user name and password
+        """Generate an Access token using the user name and password, and cache it in the integration context
         :return: valid token
         """
         body = {
@@ -108,7 +144,20 @@ class CrowdStrikeClient(BaseClient):
             'client_secret': self._client_secret
         }
         token_res = self.http_request('POST', '/oauth2/token', data=body, auth=(self._client_id, self._client_secret))
-        return token_res.get('access_token')
+        access_token = token_res.get('access_token')
+        expires_in = token_res.get('expires_in')
+        if access_token and expires_in:
+            cached_token = {
+                'access_token': access_token,
+                'valid_until': int(time.time()) + int(expires_in) - CROWDSTRIKE_TOKEN_EXPIRY_BUFFER,
+                'fingerprint': self._token_fingerprint
+            }
+            try:
+                set_to_integration_context_with_retries({CROWDSTRIKE_TOKEN_CONTEXT_KEY: cached_token})
+            except Exception as e:
+                # the token is still valid for this run, it will be generated again on the next one
+                demisto.debug(f'Could not cache the CrowdStrike access token in the integration context: {e}')
+        return access_token
 
     def check_quota_status(self) -> dict:
         """Checking the status of the quota
@@ -1,6 +1,7 @@
 from CrowdStrikeApiModule import CrowdStrikeClient
 from TestsInput.http_responses import MULTI_ERRORS_HTTP_RESPONSE, NO_ERRORS_HTTP_RESPONSE
 from TestsInput.context import MULTIPLE_ERRORS_RESULT
+import json
 import pytest
 
 
@@ -45,3 +46,78 @@ def test_handle_errors(http_response, output, mocker):
         _, output, _ = client.check_quota_status()
     except Exception as e:
         assert (str(e) == str(output))
+
+
+PARAMS = {
+    'insecure': False,
+    'credentials': {
+        'identifier': 'user1',
+        'password': '12345'
+    },
+    'proxy': False
+}
+TOKEN_URL = 'https://api.crowdstrike.com/oauth2/token'
+QUOTA_URL = 'https://api.crowdstrike.com/falconx/entities/submissions/v1?ids='
+
+
+def test_token_is_cached(requests_mock):
+    """Unit test
+    Given
+    - no cached token in the integration context
+    When
+    - creating a client twice
+    Then
+    - a token is generated for the first client and cached in the integration context
+    - the second client uses the cached token without generating a new one
+    """
+    import demistomock as demisto
+    demisto.setIntegrationContext({})
+    token_mock = requests_mock.post(TOKEN_URL, json={'access_token': 'token1', 'expires_in': 1799})
+
+    assert CrowdStrikeClient(PARAMS)._token == 'token1'
+    assert CrowdStrikeClient(PARAMS)._headers == {'Authorization': 'bearer token1'}
+    assert token_mock.call_count == 1
+    assert 'crowdstrike_access_token' in demisto.getIntegrationContext()
+
+
+@pytest.mark.parametrize('cached_token', [
+    {'access_token': 'old_token', 'valid_until': 0},
+    {'access_token': 'old_token', 'valid_until': 9999999999, 'fingerprint': 'other_credentials'},
+])
+def test_cached_token_not_valid(requests_mock, cached_token):
+    """Unit test
+    Given
+    - 1. an expired token in the integration context
+    - 2. a token of other credentials in the integration context
+    When
+    - creating a client
+    Then
+    - a new token is generated
+    """
+    import demistomock as demisto
+    demisto.setIntegrationContext({'crowdstrike_access_token': json.dumps(cached_token)})
+    requests_mock.post(TOKEN_URL, json={'access_token': 'token2', 'expires_in': 1799})
+
+    assert CrowdStrikeClient(PARAMS)._token == 'token2'
+
+
+def test_retry_on_unauthorized(requests_mock):
+    """Unit test
+    Given
+    - a cached token which was revoked
+    When
+    - sending a request which gets a 401 response
+    Then
+    - a new token is generated and the request is retried once with it
+    """
+    import demistomock as demisto
+    demisto.setIntegrationContext({})
+    token_mock = requests_mock.post(TOKEN_URL, [{'json': {'access_token': 'token1', 'expires_in': 1799}},
+                                                {'json': {'access_token': 'token2', 'expires_in': 1799}}])
+    quota_mock = requests_mock.get(QUOTA_URL, [{'status_code': 401, 'json': {'errors': []}},
+                                               {'status_code': 200, 'json': {'resources': []}}])
+
+    client = CrowdStrikeClient(PARAMS)
+    assert client.check_quota_status() == {'resources': []}
+    assert token_mock.call_count == 2
+    assert quota_mock.last_request.headers['Authorization'] == 'bearer token2'
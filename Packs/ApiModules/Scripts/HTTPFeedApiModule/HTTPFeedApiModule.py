@@ -3,9 +3,11 @@ from CommonServerPython import *
 from CommonServerUserPython import *
 
 ''' IMPORTS '''
+import concurrent.futures
+import hashlib
 import urllib3
 import requests
-from typing import Optional, Pattern, List
+from typing import Optional, Pattern, List, Dict, Callable
 
 # disable insecure warnings
 urllib3.disable_warnings()
@@ -14,13 +16,16 @@ urllib3.disable_warnings()
 TAGS = 'tags'
 TLP_COLOR = 'trafficlightprotocol'
 DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+MAX_CONCURRENT_REQUESTS = 10
+FEED_VALIDATORS_CONTEXT_KEY = 'feed_validators'
 
 
 class Client(BaseClient):
     def __init__(self, url: str, feed_name: str = 'http', insecure: bool = False, credentials: dict = None,
                  ignore_regex: str = None, encoding: str = None, indicator_type: str = '',
                  indicator: str = '', fields: str = '{}', feed_url_to_config: dict = None, polling_timeout: int = 20,
-                 headers: dict = None, proxy: bool = False, custom_fields_mapping: dict = None, **kwargs):
+                 headers: dict = None, proxy: bool = False, custom_fields_mapping: dict = None,
+                 max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS, skip_unchanged: bool = False, **kwargs):
         """Implements class for miners of plain text feeds over HTTP.
         **Config parameters**
         :param: url: URL of the feed.
@@ -60,6 +65,12 @@ class Client(BaseClient):
             }]
         }
         :param: proxy: Use proxy in requests.
+        :param: max_concurrent_requests: The maximal number of feed URLs which are fetched concurrently.
+            Default: 10
+        :param: skip_unchanged: boolean, if *true* the feeds are fetched with conditional requests (using the ETag
+            and Last-Modified headers of their last fetch, or the hash of their content if the server does not
+            return these headers), and feeds which have not changed since their last fetch are skipped.
+            Default: *false*
         **Extraction dictionary**
             Extraction dictionaries contain the following keys:
             :regex: Python regular expression for searching the text.
@@ -138,6 +149,21 @@ class Client(BaseClient):
             custom_fields_mapping = {}
         self.custom_fields_mapping = custom_fields_mapping
 
+        try:
+            self.max_concurrent_requests = max(int(max_concurrent_requests), 1)
+        except (ValueError, TypeError):
+            raise ValueError('Please provide an integer value for "Maximal concurrent requests"')
+        # all the feed URLs are fetched through a single session, whose connection pool is big enough to serve
+        # all the concurrent requests
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_concurrent_requests)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+        self.skip_unchanged = argToBoolean(skip_unchanged)
+        # the validators of the last fetch of each feed URL, and the ones of the current fetch
+        self.feed_validators: Dict[str, dict] = {}
+        self.new_feed_validators: Dict[str, dict] = {}
+
     def get_feed_config(self, fields_json: str = '', indicator_json: str = ''):
         """
         Get the feed configuration from the indicator and field JSON strings.
@@ -204,23 +230,24 @@ class Client(BaseClient):
 
         if self.username is not None and self.password is not None:
             kwargs['auth'] = (self.username, self.password)
+        if self.skip_unchanged:
+            self.feed_validators = get_integration_context().get(FEED_VALIDATORS_CONTEXT_KEY, {})
         try:
             urls = self._base_url
-            url_to_response_list: List[dict] = []
             if not isinstance(urls, list):
                 urls = [urls]
-            for url in urls:
-                r = requests.get(
-                    url,
-                    **kwargs
-                )
-                try:
-                    r.raise_for_status()
-                except Exception:
-                    LOG(f'{self.feed_name!r} - exception in request:'
-                        f' {r.status_code!r} {r.content!r}')
-                    raise
-                url_to_response_list.append({url: r})
+            if len(urls) > 1 and self.max_concurrent_requests > 1:
+                # the feeds are downloaded concurrently, each one with its own timeout. The responses are returned
+                # in the order of the URLs and an error in any of them is raised only after all of them were done.
+                max_workers = min(self.max_concurrent_requests, len(urls))
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = [executor.submit(self.get_feed_response, url, True, **kwargs) for url in urls]
+                    concurrent.futures.wait(futures)
+                responses = [future.result() for future in futures]
+            else:
+                responses = [self.get_feed_response(url, **kwargs) for url in urls]
+            # unchanged feeds have no response
+            url_to_response_list: List[dict] = [{url: r} for url, r in zip(urls, responses) if r is not None]
         except requests.exceptions.ConnectTimeout as exception:
             err_msg = 'Connection Timeout Error - potential reasons might be that the Server URL parameter' \
                       ' is incorrect or that the Server is not accessible from your host.'
@@ -268,6 +295,79 @@ class Client(BaseClient):
                 results.append({url: result})
         return results
 
+    def get_feed_response(self, url: str, download_content: bool = False, **kwargs) -> Optional[requests.Response]:
+        """
+        Send an HTTP request to get the feed of a single URL
+        :param url: The feed URL
+        :param download_content: Whether to download the whole content of the feed before returning the response
+        :param kwargs: Arguments to send to the HTTP API endpoint
+        :return: The feed response, or None if skipping unchanged feeds and the feed has not changed
+        """
+        if self.skip_unchanged:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **self.get_conditional_headers(url))
+        r = self._session.get(
+            url,
+            **kwargs
+        )
+        try:
+            r.raise_for_status()
+        except Exception:
+            LOG(f'{self.feed_name!r} - exception in request:'
+                f' {r.status_code!r} {r.content!r}')
+            raise
+        if self.skip_unchanged and self.is_feed_unchanged(url, r, lambda: hashlib.sha256(r.content).hexdigest()):
+            demisto.debug(f'{self.feed_name!r} - {url} has not changed since the last fetch, skipping it')
+            return None
+        if download_content:
+            # accessing the content reads the whole body, so it is downloaded by the calling (worker) thread
+            r.content  # pylint: disable=pointless-statement
+        return r
+
+    def get_conditional_headers(self, url: str) -> dict:
+        """
+        Build the headers of a conditional request for a feed, from the validators of its last fetch
+        :param url: The feed URL
+        :return: The conditional request headers
+        """
+        validators = self.feed_validators.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def is_feed_unchanged(self, url: str, response: requests.Response, get_content_hash: Callable[[], str]) -> bool:
+        """
+        Check whether a feed has not changed since its last fetch, according to the response status code and
+        validators (ETag and Last-Modified headers), or the hash of its content if the server does not return
+        validators. The validators of the response are kept, to be saved once the fetch is done.
+        :param url: The feed URL
+        :param response: The feed response
+        :param get_content_hash: Function which returns the hash of the feed content
+        :return: True if the feed has not changed
+        """
+        if response.status_code == 304:
+            return True
+        validators = assign_params(etag=response.headers.get('ETag'),
+                                   last_modified=response.headers.get('Last-Modified'))
+        if not validators:
+            validators = {'content_hash': get_content_hash()}
+        self.new_feed_validators[url] = validators
+        return validators == self.feed_validators.get(url)
+
+    def save_feed_validators(self):
+        """
+        Save the validators of the fetched feeds to the integration context, should be called only once the
+        indicators of the feeds were created, so that feeds which failed to be processed are not skipped later on
+        """
+        if self.new_feed_validators:
+            integration_context = get_integration_context()
+            integration_context[FEED_VALIDATORS_CONTEXT_KEY] = dict(
+                integration_context.get(FEED_VALIDATORS_CONTEXT_KEY, {}), **self.new_feed_validators)
+            set_integration_context(integration_context)
+            self.new_feed_validators = {}
+
     def custom_fields_creator(self, attributes: dict):
         created_custom_fields = {}
         for attribute in attributes.keys():
@@ -459,6 +559,10 @@ def feed_main(feed_name, params=None, prefix=''):
     command = demisto.command()
     if command != 'fetch-indicators':
         demisto.info('Command being called is {}'.format(command))
+    # skipping a feed does not mark its indicators as seen, so with the "when removed from feed" expiration policy,
+    # all of its indicators would be expired
+    client.skip_unchanged = client.skip_unchanged and command == 'fetch-indicators' and \
+        params.get('feedExpirationPolicy') != 'suddenDeath'
     if prefix and not prefix.endswith('-'):
         prefix += '-'
     # Switch case
@@ -473,6 +577,7 @@ def feed_main(feed_name, params=None, prefix=''):
             # we submit the indicators in batches
             for b in batch(indicators, batch_size=2000):
                 demisto.createIndicators(b)
+            client.save_feed_validators()
         else:
             args = demisto.args()
             args['feed_name'] = feed_name
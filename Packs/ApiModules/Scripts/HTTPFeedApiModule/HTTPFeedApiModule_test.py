@@ -441,3 +441,134 @@ def test_get_indicators_without_relations():
                                               create_relationships=False)
 
         assert indicators == expected_res
+
+
+def test_build_iterator_multiple_urls_concurrently(requests_mock):
+    """
+    Given:
+    - A feed with several URLs, each of them returning different indicators
+
+    When:
+    - Fetching the feeds concurrently and sequentially
+
+    Then:
+    - Validate the results are returned in the order of the URLs, regardless of the concurrency
+    """
+    urls = [f'https://www.feed.com/{i}.txt' for i in range(5)]
+    for i, url in enumerate(urls):
+        requests_mock.get(url, content=f'1.1.1.{i}\n2.2.2.{i}\n'.encode('utf-8'))
+
+    results = []
+    for max_concurrent_requests in (1, 3):
+        client = Client(url=urls, feed_url_to_config={url: {'indicator_type': 'IP'} for url in urls},
+                        max_concurrent_requests=max_concurrent_requests)
+        results.append([{url: list(lines) for url, lines in result.items()} for result in client.build_iterator()])
+
+    assert results[0] == results[1] == [{url: [f'1.1.1.{i}', f'2.2.2.{i}']} for i, url in enumerate(urls)]
+
+
+def test_build_iterator_multiple_urls_with_error(requests_mock):
+    """
+    Given:
+    - A feed with several URLs, one of them returns an error
+
+    When:
+    - Fetching the feeds concurrently
+
+    Then:
+    - Validate the error is raised after all the other URLs were fetched
+    """
+    import pytest
+    urls = [f'https://www.feed.com/{i}.txt' for i in range(4)]
+    for url in urls:
+        requests_mock.get(url, content=b'1.1.1.1\n')
+    requests_mock.get(urls[1], status_code=500)
+
+    client = Client(url=urls, feed_url_to_config={url: {} for url in urls}, max_concurrent_requests=4)
+    with pytest.raises(Exception, match='500'):
+        client.build_iterator()
+    assert requests_mock.call_count == len(urls)
+
+
+class TestSkipUnchanged:
+    FEED_URL = 'https://www.feed.com/ips.txt'
+
+    def run_fetch(self, mocker, params):
+        mocker.patch.object(demisto, 'params', return_value=params)
+        mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+        return mocker.patch.object(demisto, 'createIndicators')
+
+    def mock_integration_context(self, mocker):
+        import HTTPFeedApiModule
+        integration_context = {'other_key': 'value'}
+        mocker.patch.object(HTTPFeedApiModule, 'get_integration_context', side_effect=lambda: dict(integration_context))
+        mocker.patch.object(HTTPFeedApiModule, 'set_integration_context', side_effect=integration_context.update)
+        return integration_context
+
+    def test_etag(self, mocker, requests_mock):
+        """
+        Given
+        - A feed which skips unchanged feeds, and a server which returns an ETag.
+
+        When
+        - Fetching indicators twice, while the feed does not change.
+
+        Then
+        - Ensure the second fetch sends the ETag of the first one, and does not create indicators on 304.
+        """
+        integration_context = self.mock_integration_context(mocker)
+        params = {'url': self.FEED_URL, 'indicator_type': 'IP', 'skip_unchanged': True}
+        requests_mock.get(self.FEED_URL, content=b'1.1.1.1\n2.2.2.2\n', headers={'ETag': '"v1"'})
+        requests_mock.get(self.FEED_URL, request_headers={'If-None-Match': '"v1"'}, status_code=304)
+
+        create_indicators = self.run_fetch(mocker, params)
+        feed_main('great_feed_name')
+        assert len(create_indicators.call_args[0][0]) == 2
+        assert integration_context == {'other_key': 'value', 'feed_validators': {self.FEED_URL: {'etag': '"v1"'}}}
+
+        create_indicators = self.run_fetch(mocker, params)
+        feed_main('great_feed_name')
+        assert requests_mock.last_request.headers['If-None-Match'] == '"v1"'
+        assert create_indicators.call_count == 0
+
+    def test_content_hash(self, mocker, requests_mock):
+        """
+        Given
+        - A feed which skips unchanged feeds, and a server which does not return validators.
+
+        When
+        - Fetching indicators while the feed does not change, and after it changes.
+
+        Then
+        - Ensure indicators are created only when the content of the feed changes.
+        """
+        self.mock_integration_context(mocker)
+        params = {'url': self.FEED_URL, 'indicator_type': 'IP', 'skip_unchanged': True}
+        fetched_indicators = []
+        for content in (b'1.1.1.1\n', b'1.1.1.1\n', b'1.1.1.1\n3.3.3.3\n'):
+            requests_mock.get(self.FEED_URL, content=content)
+            create_indicators = self.run_fetch(mocker, params)
+            feed_main('great_feed_name')
+            fetched_indicators.append(sum(len(call_args[0][0]) for call_args in create_indicators.call_args_list))
+
+        assert fetched_indicators == [1, 0, 2]
+
+    def test_sudden_death_expiration_policy(self, mocker, requests_mock):
+        """
+        Given
+        - A feed which skips unchanged feeds, with the "when removed from feed" expiration policy.
+
+        When
+        - Fetching indicators twice, while the feed does not change.
+
+        Then
+        - Ensure the feed is not skipped, as its indicators would have been expired.
+        """
+        self.mock_integration_context(mocker)
+        params = {'url': self.FEED_URL, 'indicator_type': 'IP', 'skip_unchanged': True,
+                  'feedExpirationPolicy': 'suddenDeath'}
+        requests_mock.get(self.FEED_URL, content=b'1.1.1.1\n')
+        for _ in range(2):
+            create_indicators = self.run_fetch(mocker, params)
+            feed_main('great_feed_name')
+            assert create_indicators.call_count == 1
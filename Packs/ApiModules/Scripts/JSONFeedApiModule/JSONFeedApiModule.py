@@ -1,20 +1,36 @@
 from CommonServerPython import *
 
 ''' IMPORTS '''
+import hashlib
 import urllib3
 import jmespath
-from typing import List, Dict, Union, Optional, Callable
+from typing import List, Dict, Union, Optional, Callable, Iterable, Iterator, Any
 
 # disable insecure warnings
 urllib3.disable_warnings()
 
+STREAM_CHUNK_SIZE = 64 * 1024  # bytes read from the feed response at a time
+FEED_VALIDATORS_CONTEXT_KEY = 'feed_validators'
+JSON_DECODER = json.JSONDecoder()
+JSON_WHITESPACE_REGEX = re.compile(r'[ \t\n\r]*')
+JSON_NUMBER_CHARS = '0123456789+-.eE'
+# The subset of JMESPath the streaming extractor supports: a path of object keys (e.g. `data.items` or `"the-key"`),
+# optionally followed by a projection (`[*]`) or an equality filter (`[?service=='AMAZON']`) over the array it
+# points to.
+JMESPATH_KEY = r'(?:[A-Za-z_][A-Za-z0-9_]*|"[^"\\]*")'
+STREAMABLE_EXTRACTOR_REGEX = re.compile(
+    rf'^(?:@|(?P<path>{JMESPATH_KEY}(?:\.{JMESPATH_KEY})*))?'
+    rf'(?P<projection>\[(?:\*|\?(?P<filter_key>{JMESPATH_KEY})\s*==\s*\'(?P<filter_value>[^\'\\]*)\')\])?$'
+)
+
 
 class Client:
     def __init__(self, url: str = '', credentials: dict = None,
                  feed_name_to_config: Dict[str, dict] = None, source_name: str = 'JSON',
                  extractor: str = '', indicator: str = 'indicator',
                  insecure: bool = False, cert_file: str = None, key_file: str = None, headers: Union[dict, str] = None,
-                 tlp_color: Optional[str] = None, data: Union[str, dict] = None, **_):
+                 tlp_color: Optional[str] = None, data: Union[str, dict] = None, stream_extractor: bool = False,
+                 skip_unchanged: bool = False, **_):
         """
         Implements class for miners of JSON feeds over http/https.
         :param url: URL of the feed.
@@ -36,6 +52,14 @@ class Client:
         :param data: Data to post. If not specified will do a GET request. May also be passed as dict as
             supported by requests. If passed as a string will set content-type to
             application/x-www-form-urlencoded if not specified in the headers.
+        :param stream_extractor: Default for feeds which do not set 'stream_extractor' in their config.
+            If *True* and the extractor is a simple path (e.g. `prefixes[?service=='AMAZON']`), the response is
+            parsed incrementally and the indicators are extracted one at a time, instead of loading the whole
+            JSON document to memory. Other extractors are evaluated with JMESPath as usual.
+        :param skip_unchanged: If *True* the feeds are fetched with conditional requests (using the ETag and
+            Last-Modified headers of their last fetch, or the hash of their content if the server does not return
+            these headers), and feeds which have not changed since their last fetch are skipped. Feeds with a
+            'custom_build_iterator' are never skipped.
 
          Example:
             Example feed config:
@@ -55,6 +79,7 @@ class Client:
                     'url': url,
                     'indicator': indicator or 'indicator',
                     'extractor': extractor or '@',
+                    'stream_extractor': stream_extractor,
                 }}
 
         # Request related attributes
@@ -77,6 +102,11 @@ class Client:
         self.cert = (cert_file, key_file) if cert_file and key_file else None
         self.tlp_color = tlp_color
         self.post_data = data
+        self.stream_extractor = stream_extractor
+        self.skip_unchanged = argToBoolean(skip_unchanged)
+        # the validators of the last fetch of each feed URL, and the ones of the current fetch
+        self.feed_validators: Optional[Dict[str, dict]] = None
+        self.new_feed_validators: Dict[str, dict] = {}
 
         if isinstance(self.post_data, str):
             content_type_header = 'Content-Type'
@@ -106,15 +136,29 @@ class Client:
         else:
             return headers
 
-    def build_iterator(self, feed: dict, **kwargs) -> List:
+    def build_iterator(self, feed: dict, **kwargs) -> Iterable:
         url = feed.get('url', self.url)
+        extractor = feed.get('extractor')
+        streamable_extractor = None
+        if feed.get('stream_extractor', self.stream_extractor):
+            streamable_extractor = parse_streamable_extractor(extractor)
+            if streamable_extractor:
+                kwargs['stream'] = True
+            else:
+                demisto.debug(f'The extractor {extractor} is not supported by the streaming extractor, '
+                              f'falling back to JMESPath.')
+
+        # feeds with a custom iterator usually paginate, so their requests cannot be skipped
+        skip_unchanged = self.skip_unchanged and not feed.get('custom_build_iterator')
+        headers = dict(self.headers, **self.get_conditional_headers(url)) if skip_unchanged else self.headers
+
         if not self.post_data:
             r = requests.get(
                 url=url,
                 verify=self.verify,
                 auth=self.auth,
                 cert=self.cert,
-                headers=self.headers,
+                headers=headers,
                 **kwargs
             )
         else:
@@ -124,20 +168,233 @@ class Client:
                 verify=self.verify,
                 auth=self.auth,
                 cert=self.cert,
-                headers=self.headers,
+                headers=headers,
                 **kwargs
             )
 
         try:
             r.raise_for_status()
+            if skip_unchanged and self.is_feed_unchanged(url, r, lambda: hashlib.sha256(r.content).hexdigest()):
+                demisto.debug(f'{url} has not changed since the last fetch, skipping it')
+                return []
+            if streamable_extractor:
+                return stream_extract(iter_response_text(r), streamable_extractor)
             data = r.json()
-            result = jmespath.search(expression=feed.get('extractor'), data=data)
+            result = jmespath.search(expression=extractor, data=data)
 
         except ValueError as VE:
             raise ValueError(f'Could not parse returned data to Json. \n\nError massage: {VE}')
 
         return result
 
+    def get_conditional_headers(self, url: str) -> dict:
+        """Builds the headers of a conditional request for a feed, from the validators of its last fetch.
+
+        Args:
+            url: The feed URL.
+
+        Returns:
+            dict. The conditional request headers.
+        """
+        if self.feed_validators is None:
+            self.feed_validators = get_integration_context().get(FEED_VALIDATORS_CONTEXT_KEY, {})
+        validators = self.feed_validators.get(url, {})
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def is_feed_unchanged(self, url: str, response: requests.Response, get_content_hash: Callable[[], str]) -> bool:
+        """Checks whether a feed has not changed since its last fetch, according to the response status code and
+        validators (ETag and Last-Modified headers), or the hash of its content if the server does not return
+        validators. The validators of the response are kept, to be saved once the fetch is done.
+
+        Args:
+            url: The feed URL.
+            response: The feed response.
+            get_content_hash: Function which returns the hash of the feed content.
+
+        Returns:
+            bool. True if the feed has not changed.
+        """
+        if response.status_code == 304:
+            return True
+        validators = assign_params(etag=response.headers.get('ETag'),
+                                   last_modified=response.headers.get('Last-Modified'))
+        if not validators:
+            validators = {'content_hash': get_content_hash()}
+        self.new_feed_validators[url] = validators
+        return validators == (self.feed_validators or {}).get(url)
+
+    def save_feed_validators(self):
+        """Saves the validators of the fetched feeds to the integration context. Should be called only once the
+        indicators of the feeds were created, so that feeds which failed to be processed are not skipped later on.
+        """
+        if self.new_feed_validators:
+            integration_context = get_integration_context()
+            integration_context[FEED_VALIDATORS_CONTEXT_KEY] = dict(
+                integration_context.get(FEED_VALIDATORS_CONTEXT_KEY, {}), **self.new_feed_validators)
+            set_integration_context(integration_context)
+            self.new_feed_validators = {}
+
+
+class JsonStreamReader:
+    """Reads a JSON document from a stream of text chunks one value at a time, so that only the value currently
+    being read (rather than the whole document) is held in memory.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+        self._pos = 0
+
+    def _read_more(self) -> bool:
+        """Drops the consumed part of the buffer and appends at least as much new data as is still pending, so that
+        re-decoding a value which spans many chunks stays linear in its size.
+
+        Returns:
+            bool. False if the stream is exhausted.
+        """
+        pending = self._buffer[self._pos:]
+        new_chunks: List[str] = []
+        new_size = 0
+        for chunk in self._chunks:
+            new_chunks.append(chunk)
+            new_size += len(chunk)
+            if new_size >= len(pending):
+                break
+        if not new_chunks:
+            return False
+        self._buffer = pending + ''.join(new_chunks)
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character, or an empty string at the end of the stream."""
+        while True:
+            self._pos = JSON_WHITESPACE_REGEX.match(self._buffer, self._pos).end()  # type: ignore
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ''
+
+    def expect(self, char: str):
+        next_char = self.peek()
+        if next_char != char:
+            raise ValueError(f'Expecting "{char}" but found "{next_char}"')
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decodes the next JSON value in the stream."""
+        self.peek()
+        while True:
+            try:
+                value, end = JSON_DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._read_more():
+                    continue
+                raise
+            # a number which ends where the buffer ends might continue in the next chunk
+            if isinstance(value, (int, float)) and self._buffer[end:end + 1] in JSON_NUMBER_CHARS \
+                    and self._read_more():
+                continue
+            self._pos = end
+            return value
+
+    def find_key(self, key: str) -> bool:
+        """Moves to the value of `key` in the current JSON object, skipping the values of the keys before it.
+
+        Returns:
+            bool. False if the current value is not an object or the key does not exist in it.
+        """
+        if self.peek() != '{':
+            return False
+        self._pos += 1
+        while self.peek() not in ('}', ''):
+            current_key = self.read_value()
+            self.expect(':')
+            if current_key == key:
+                return True
+            self.read_value()
+            if self.peek() == ',':
+                self._pos += 1
+        return False
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yields the items of the current JSON array one by one."""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() != ',':
+                break
+            self._pos += 1
+        self.expect(']')
+
+
+def parse_streamable_extractor(extractor: Optional[str]) -> Optional[dict]:
+    """Checks whether a JMESPath expression is simple enough to be evaluated by the streaming extractor.
+
+    Args:
+        extractor: The JMESPath expression.
+
+    Returns:
+        dict. The keys leading to the extracted value, whether it is projected and the equality filter over it,
+        or None if the expression is not supported.
+    """
+    match = STREAMABLE_EXTRACTOR_REGEX.match((extractor or '@').strip())
+    if not match:
+        return None
+    filter_key = match.group('filter_key')
+    return {
+        'keys': [key.strip('"') for key in re.findall(JMESPATH_KEY, match.group('path') or '')],
+        'projection': bool(match.group('projection')),
+        'filter': (filter_key.strip('"'), match.group('filter_value')) if filter_key else None,
+    }
+
+
+def stream_extract(chunks: Iterable[str], streamable_extractor: dict) -> Iterator[Any]:
+    """Lazily extracts the items matching a streamable extractor from a JSON document.
+
+    Args:
+        chunks: The JSON document, chunk by chunk.
+        streamable_extractor: The parsed extractor, as returned from `parse_streamable_extractor`.
+
+    Returns:
+        Iterator. The items the JMESPath expression would have returned.
+    """
+    reader = JsonStreamReader(chunks)
+    try:
+        for key in streamable_extractor['keys']:
+            if not reader.find_key(key):
+                return
+
+        if reader.peek() != '[':
+            # iterate the value as the JMESPath result would have been iterated,
+            # projecting or filtering anything but an array returns nothing
+            value = reader.read_value()
+            if not streamable_extractor['projection'] and isinstance(value, (dict, str)):
+                yield from value
+            return
+
+        filter_key, filter_value = streamable_extractor['filter'] or (None, None)
+        for item in reader.iter_array():
+            if filter_key is None or (isinstance(item, dict) and item.get(filter_key) == filter_value):
+                yield item
+
+    except ValueError as VE:
+        raise ValueError(f'Could not parse returned data to Json. \n\nError massage: {VE}')
+
+
+def iter_response_text(response: requests.Response) -> Iterator[str]:
+    if not response.encoding:
+        response.encoding = 'utf-8'
+    return response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True)
+
 
 def test_module(client: Client, limit) -> str:
     for feed_name, feed in client.feed_name_to_config.items():
@@ -324,6 +581,10 @@ def feed_main(params, feed_name, prefix):
         prefix += '-'
     if command != 'fetch-indicators':
         demisto.info(f'Command being called is {demisto.command()}')
+    # skipping a feed does not mark its indicators as seen, so with the "when removed from feed" expiration policy,
+    # all of its indicators would be expired
+    client.skip_unchanged = client.skip_unchanged and command == 'fetch-indicators' and \
+        params.get('feedExpirationPolicy') != 'suddenDeath'
     try:
         if command == 'test-module':
             return_results(test_module(client, limit))
@@ -335,6 +596,7 @@ def feed_main(params, feed_name, prefix):
             else:
                 for b in batch(indicators, batch_size=2000):
                     demisto.createIndicators(b)
+            client.save_feed_validators()
 
         elif command == f'{prefix}get-indicators':
             # dummy command for testing
@@ -1,4 +1,5 @@
 from JSONFeedApiModule import Client, fetch_indicators_command, jmespath
+import pytest
 from CommonServerPython import *
 import requests_mock
 
@@ -161,3 +162,136 @@ Stam : Ba
     assert res['User-Agent'] == 'test'
     assert res['Stam'] == 'Ba'
     assert len(res) == 3
+
+
+def test_parse_streamable_extractor():
+    """
+    Given:
+    - JMESPath extractors
+
+    When:
+    - Checking whether the streaming extractor supports them
+
+    Then:
+    - Validate simple paths, projections and equality filters are supported and anything else is not
+    """
+    from JSONFeedApiModule import parse_streamable_extractor
+    assert parse_streamable_extractor('@') == {'keys': [], 'projection': False, 'filter': None}
+    assert parse_streamable_extractor('data."the-items"[*]') == {'keys': ['data', 'the-items'], 'projection': True,
+                                                                 'filter': None}
+    assert parse_streamable_extractor("prefixes[?service=='AMAZON']") == {'keys': ['prefixes'], 'projection': True,
+                                                                          'filter': ('service', 'AMAZON')}
+    assert parse_streamable_extractor('prefixes[].ip_prefix') is None
+    assert parse_streamable_extractor('prefixes[*].ip_prefix') is None
+    assert parse_streamable_extractor("prefixes[?service!='AMAZON']") is None
+
+
+@pytest.mark.parametrize('extractor', ['@', 'prefixes', 'prefixes[*]', "prefixes[?service=='AMAZON']",
+                                       "ipv6_prefixes[?region=='us-east-1']", 'syncToken', 'not_a_key[*]'])
+@pytest.mark.parametrize('chunk_size', [1, 7, 10 ** 6])
+def test_stream_extract(extractor, chunk_size):
+    """
+    Given:
+    - A JSON document split to chunks of different sizes and a streamable extractor
+
+    When:
+    - Extracting the items with the streaming extractor
+
+    Then:
+    - Validate the same items are extracted as with JMESPath
+    """
+    from JSONFeedApiModule import parse_streamable_extractor, stream_extract
+    with open('test_data/amazon_ip_ranges.json') as ip_ranges_json:
+        document = ip_ranges_json.read()
+    if extractor == '@':
+        document = json.dumps(json.loads(document)['prefixes'][:50])
+    chunks = (document[i:i + chunk_size] for i in range(0, len(document), chunk_size))
+
+    expected = jmespath.search(extractor, json.loads(document))
+    assert list(stream_extract(chunks, parse_streamable_extractor(extractor))) == list(expected or [])
+
+
+def test_stream_extract_nested_path_and_numbers():
+    from JSONFeedApiModule import parse_streamable_extractor, stream_extract
+    document = '{"a": [1, {"x": {"y": 2}}], "b": {"c": [12345, -1.5e10, "\\u00e9", null, true]}}'
+    chunks = (document[i:i + 3] for i in range(0, len(document), 3))
+    assert list(stream_extract(chunks, parse_streamable_extractor('b.c'))) == [12345, -1.5e10, 'é', None, True]
+
+
+def test_stream_extract_invalid_json():
+    from JSONFeedApiModule import parse_streamable_extractor, stream_extract
+    with pytest.raises(ValueError, match='Could not parse returned data to Json'):
+        list(stream_extract(['{"a": [1, 2'], parse_streamable_extractor('a')))
+
+
+@pytest.mark.parametrize('extractor', ["prefixes[?service=='AMAZON']", "prefixes[?service=='AMAZON'].ip_prefix"])
+def test_json_feed_with_stream_extractor(extractor):
+    """
+    Given:
+    - A feed configured to use the streaming extractor, with a streamable and a non streamable extractor
+
+    When:
+    - Fetching indicators
+
+    Then:
+    - Validate the same indicators are fetched as without streaming
+    """
+    with open('test_data/amazon_ip_ranges.json') as ip_ranges_json:
+        ip_ranges = json.load(ip_ranges_json)
+
+    feed_name_to_config = {
+        'AMAZON': {
+            'url': 'https://ip-ranges.amazonaws.com/ip-ranges.json',
+            'extractor': extractor,
+            'indicator': 'ip_prefix',
+            'indicator_type': FeedIndicatorType.CIDR,
+        }
+    }
+
+    with requests_mock.Mocker() as m:
+        m.get('https://ip-ranges.amazonaws.com/ip-ranges.json', json=ip_ranges)
+        client = Client(feed_name_to_config=feed_name_to_config)
+        indicators = fetch_indicators_command(client=client, indicator_type='CIDR', feedTags=[], auto_detect=False)
+        client = Client(feed_name_to_config=feed_name_to_config, stream_extractor=True)
+        streamed_indicators = fetch_indicators_command(client=client, indicator_type='CIDR', feedTags=[],
+                                                       auto_detect=False)
+    assert len(indicators) == 1117
+    assert streamed_indicators == indicators
+
+
+def test_feed_main_skip_unchanged(mocker):
+    """
+    Given:
+    - A feed which skips unchanged feeds, served with a Last-Modified header
+
+    When:
+    - Running fetch-indicators twice while the feed does not change
+
+    Then:
+    - Validate the second fetch sends a conditional request and creates no indicators on 304
+    """
+    import JSONFeedApiModule
+    from JSONFeedApiModule import feed_main
+    integration_context: dict = {}
+    mocker.patch.object(JSONFeedApiModule, 'get_integration_context', side_effect=lambda: dict(integration_context))
+    mocker.patch.object(JSONFeedApiModule, 'set_integration_context', side_effect=integration_context.update)
+    mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+    url = 'https://ip-ranges.amazonaws.com/ip-ranges.json'
+    last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    params = {'url': url, 'extractor': "prefixes[?service=='AMAZON']", 'indicator': 'ip_prefix',
+              'indicator_type': 'CIDR', 'skip_unchanged': True}
+
+    with open('test_data/amazon_ip_ranges.json') as ip_ranges_json:
+        ip_ranges = json.load(ip_ranges_json)
+
+    created_indicators = []
+    with requests_mock.Mocker() as m:
+        m.get(url, json=ip_ranges, headers={'Last-Modified': last_modified})
+        m.get(url, request_headers={'If-Modified-Since': last_modified}, status_code=304)
+        for _ in range(2):
+            create_indicators = mocker.patch.object(demisto, 'createIndicators')
+            feed_main(params, 'JSON Feed', 'json')
+            created_indicators.append(sum(len(call_args[0][0]) for call_args in create_indicators.call_args_list))
+
+    assert created_indicators == [1117, 0]
+    assert integration_context == {'feed_validators': {url: {'last_modified': last_modified}}}
@@ -6,6 +6,7 @@ Note that adding code to CommonServerUserPython can override functions in Common
 from __future__ import print_function
 
 import base64
+import itertools
 import json
 import logging
 import os
@@ -1681,19 +1682,47 @@ def create_clickable_url(url):
     return '[{}]({})'.format(url, url)
 
 
-def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=False, metadata=None, url_keys=None):
+MARKDOWN_TABLE_NULL_VALUES = ('', None, [], {})
+
+
+def _markdown_table_cell(value):
     """
-       Converts a demisto table in JSON form to a Markdown table
+       Formats and escapes a single markdown table cell value.
+       Plain strings with no table breaking characters are returned as is, without going through
+       ``formatCell`` and ``stringEscapeMD``.
+
+       :type value: ``any``
+       :param value: The cell value
+
+       :return: The escaped cell content
+       :rtype: ``str``
+    """
+    if value is None:
+        return ''
+    if not isinstance(value, STRING_TYPES):
+        value = formatCell(value, False)
+    if '|' in value or '\n' in value or '\r' in value:
+        value = stringEscapeMD(value, True, True)
+    return value
+
+
+def iter_table_to_markdown(name, t, headers=None, headerTransform=None, removeNull=False, metadata=None,
+                           url_keys=None, max_rows=None):
+    """
+       Generator variant of ``tableToMarkdown``. Yields the markdown table in pieces - the name, the metadata,
+       the header rows and then a single line per table row - so large tables can be written out as they
+       are rendered. Joining the yielded pieces gives the ``tableToMarkdown`` output.
 
        :type name: ``str``
        :param name: The name of the table (required)
 
-       :type t: ``dict`` or ``list``
-       :param t: The JSON table - List of dictionaries with the same keys or a single dictionary (required)
+       :type t: ``dict`` or ``list`` or ``iterator``
+       :param t: The JSON table - List of dictionaries with the same keys, a single dictionary or an iterator
+            of dictionaries (required). An iterator is consumed lazily unless ``removeNull`` is set.
 
        :type headers: ``list`` or ``string``
        :param headers: A list of headers to be presented in the output table (by order). If string will be passed
-            then table will have single header. Default will include all available headers.
+            then table will have single header. Default will include all the headers of the first row.
 
        :type headerTransform: ``function``
        :param headerTransform: A function that formats the original data headers (optional)
@@ -1707,81 +1736,143 @@ def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=Fals
        :type url_keys: ``list``
        :param url_keys: a list of keys in the given JSON table that should be turned in to clickable
 
-       :return: A string representation of the markdown table
-       :rtype: ``str``
-    """
-    # Turning the urls in the table to clickable
-    if url_keys:
-        t = url_to_clickable_markdown(t, url_keys)
+       :type max_rows: ``int``
+       :param max_rows: The maximal number of rows to render. The rest of the rows are counted and summed up in
+            a "N more rows" footer. Default is None (render all the rows)
 
-    mdResult = ''
+       :return: A generator of the markdown table pieces
+       :rtype: ``Iterator[str]``
+    """
     if name:
-        mdResult = '### ' + name + '\n'
+        yield '### ' + name + '\n'
 
     if metadata:
-        mdResult += metadata + '\n'
+        yield metadata + '\n'
 
-    if not t or len(t) == 0:
-        mdResult += '**No entries.**\n'
-        return mdResult
+    try:
+        is_iterator = iter(t) is t
+    except TypeError:
+        is_iterator = False
+
+    if is_iterator:
+        first_row = next(t, None)
+        if first_row is None:
+            yield '**No entries.**\n'
+            return
+        rows = itertools.chain([first_row], t)
+    else:
+        if not t or len(t) == 0:
+            yield '**No entries.**\n'
+            return
+        if not isinstance(t, list):
+            t = [t]
+        first_row = t[0]
+        rows = t
 
-    if not isinstance(t, list):
-        t = [t]
+    if url_keys:
+        rows = (url_to_clickable_markdown(row, url_keys) for row in rows)
 
     if headers and isinstance(headers, STRING_TYPES):
         headers = [headers]
 
-    if not isinstance(t[0], dict):
+    if not isinstance(first_row, dict):
         # the table contains only simple objects (strings, numbers)
         # should be only one header
         if headers and len(headers) > 0:
             header = headers[0]
-            t = map(lambda item: dict((h, item) for h in [header]), t)
+            rows = ({header: item} for item in rows)
         else:
             raise Exception("Missing headers param for tableToMarkdown. Example: headers=['Some Header']")
 
     # in case of headers was not provided (backward compatibility)
     if not headers:
-        headers = list(t[0].keys())
-        headers.sort()
+        headers = sorted(first_row.keys())
+
+    rows = iter(rows)
+    shown_rows = itertools.islice(rows, max_rows) if max_rows is not None else rows
 
     if removeNull:
-        headers_aux = headers[:]
-        for header in headers:
-            if all(obj.get(header) in ('', None, [], {}) for obj in t):
-                headers_aux.remove(header)
-        headers = headers_aux
-
-    if t and len(headers) > 0:
-        newHeaders = []
-        if headerTransform is None:  # noqa
-            def headerTransform(s): return stringEscapeMD(s, True, True)  # noqa
-        for header in headers:
-            newHeaders.append(headerTransform(header))
-        mdResult += '|'
-        if len(newHeaders) == 1:
-            mdResult += newHeaders[0]
-        else:
-            mdResult += '|'.join(newHeaders)
-        mdResult += '|\n'
-        sep = '---'
-        mdResult += '|' + '|'.join([sep] * len(headers)) + '|\n'
-        for entry in t:
-            vals = [stringEscapeMD((formatCell(entry.get(h, ''), False) if entry.get(h) is not None else ''),
-                                   True, True) for h in headers]
-            # this pipe is optional
-            mdResult += '| '
-            try:
-                mdResult += ' | '.join(vals)
-            except UnicodeDecodeError:
-                vals = [str(v) for v in vals]
-                mdResult += ' | '.join(vals)
-            mdResult += ' |\n'
+        # a single pass over the rows, dropping a header from the candidates once it has a value
+        shown_rows = list(shown_rows)
+        null_headers = set(headers)
+        for row in shown_rows:
+            if not null_headers:
+                break
+            null_headers.difference_update([h for h in null_headers if row.get(h) not in MARKDOWN_TABLE_NULL_VALUES])
+        headers = [h for h in headers if h not in null_headers]
 
-    else:
-        mdResult += '**No entries.**\n'
+    if not headers:
+        yield '**No entries.**\n'
+        return
 
-    return mdResult
+    if headerTransform is None:  # noqa
+        def headerTransform(s): return stringEscapeMD(s, True, True)  # noqa
+    yield '|' + '|'.join([headerTransform(header) for header in headers]) + '|\n'
+    yield '|' + '|'.join(['---'] * len(headers)) + '|\n'
+
+    for row in shown_rows:
+        vals = [_markdown_table_cell(row.get(h)) for h in headers]
+        # this pipe is optional
+        try:
+            yield '| ' + ' | '.join(vals) + ' |\n'
+        except UnicodeDecodeError:
+            vals = [str(v) for v in vals]
+            yield '| ' + ' | '.join(vals) + ' |\n'
+
+    if max_rows is not None:
+        more_rows = sum(1 for _ in rows)
+        if more_rows:
+            yield '\n**{} more rows.**\n'.format(more_rows)
+
+
+def tableToMarkdown(name, t, headers=None, headerTransform=None, removeNull=False, metadata=None, url_keys=None,
+                    max_rows=None):
+    """
+       Converts a demisto table in JSON form to a Markdown table
+
+       :type name: ``str``
+       :param name: The name of the table (required)
+
+       :type t: ``dict`` or ``list``
+       :param t: The JSON table - List of dictionaries with the same keys or a single dictionary (required)
+
+       :type headers: ``list`` or ``string``
+       :param headers: A list of headers to be presented in the output table (by order). If string will be passed
+            then table will have single header. Default will include all available headers.
+
+       :type headerTransform: ``function``
+       :param headerTransform: A function that formats the original data headers (optional)
+
+       :type removeNull: ``bool``
+       :param removeNull: Remove empty columns from the table. Default is False
+
+       :type metadata: ``str``
+       :param metadata: Metadata about the table contents
+
+       :type url_keys: ``list``
+       :param url_keys: a list of keys in the given JSON table that should be turned in to clickable
+
+       :type max_rows: ``int``
+       :param max_rows: The maximal number of rows to render, followed by a "N more rows" footer. Default is
+            None (render all the rows)
+
+       :return: A string representation of the markdown table
+       :rtype: ``str``
+    """
+    md_pieces = list(iter_table_to_markdown(name, t, headers=headers, headerTransform=headerTransform,
+                                            removeNull=removeNull, metadata=metadata, url_keys=url_keys,
+                                            max_rows=max_rows))
+    try:
+        return ''.join(md_pieces)
+    except UnicodeDecodeError:
+        # python 2 - mixed str and unicode pieces, fall back to converting the failing pieces to str
+        mdResult = ''
+        for piece in md_pieces:
+            try:
+                mdResult += piece
+            except UnicodeDecodeError:
+                mdResult += str(piece)
+        return mdResult
 
 
 tblToMd = tableToMarkdown
@@ -6631,23 +6722,86 @@ if 'requests' in sys.modules:
             The request authorization, for example: (username, password).
             Can be None.
 
+        :type pool_connections: ``int``
+        :param pool_connections: The number of hosts for which connection pools are kept.
+
+        :type pool_maxsize: ``int``
+        :param pool_maxsize: The maximal number of connections kept alive in the pool of a host.
+
+        :type retries: ``int``
+        :param retries: The default number of retries of the requests, see ``_implement_retry`` for the rest of the
+            retry arguments. The retry policy can still be overridden by passing ``retries`` to ``_http_request``.
+
         :return: No data returned
         :rtype: ``None``
         """
 
-        def __init__(self, base_url, verify=True, proxy=False, ok_codes=tuple(), headers=None, auth=None):
+        def __init__(self, base_url, verify=True, proxy=False, ok_codes=tuple(), headers=None, auth=None,
+                     pool_connections=10, pool_maxsize=10, retries=0, status_list_to_retry=None, backoff_factor=5,
+                     raise_on_redirect=False, raise_on_status=False):
             self._base_url = base_url
             self._verify = verify
             self._ok_codes = ok_codes
             self._headers = headers
             self._auth = auth
             self._session = requests.Session()
+            self._pool_connections = pool_connections
+            self._pool_maxsize = pool_maxsize
+            self._adapter = None
+            if retries:
+                self._implement_retry(retries, status_list_to_retry, backoff_factor, raise_on_redirect, raise_on_status)
+            else:
+                self._mount_adapter()
             if not proxy:
                 skip_proxy()
 
             if not verify:
                 skip_cert_verification()
 
+        def _mount_adapter(self, max_retries=None):
+            """
+            Mounts a single HTTP adapter on the session, so the connections in its pools are kept alive and reused
+            by all the requests of the client. Later calls only replace the retry policy of the mounted adapter.
+
+            :type max_retries: ``Retry``
+            :param max_retries: The retry policy of the adapter. If None, keeps the current policy.
+            """
+            try:
+                adapter = getattr(self, '_adapter', None)
+                if adapter is None:
+                    adapter = HTTPAdapter(pool_connections=getattr(self, '_pool_connections', 10),
+                                          pool_maxsize=getattr(self, '_pool_maxsize', 10))
+                    self._session.mount('http://', adapter)
+                    self._session.mount('https://', adapter)
+                    self._adapter = adapter
+                if max_retries is not None:
+                    adapter.max_retries = max_retries
+            except NameError:
+                pass
+
+        def _get_connection_pool_stats(self):
+            """
+            Gets statistics of the connection pools of the client, to check that connections are kept alive.
+            Every request sent on a connection which was already open is counted as a reused connection.
+
+            :return: The number of pools, connections created, connections reused and requests sent.
+            :rtype: ``dict``
+            """
+            stats = {'pools': 0, 'connections_created': 0, 'connections_reused': 0, 'requests': 0}
+            adapter = getattr(self, '_adapter', None)
+            if adapter is None:
+                return stats
+            for pool_manager in [adapter.poolmanager] + list(adapter.proxy_manager.values()):
+                for pool_key in pool_manager.pools.keys():
+                    pool = pool_manager.pools.get(pool_key)
+                    if pool is None:
+                        continue
+                    stats['pools'] += 1
+                    stats['connections_created'] += pool.num_connections
+                    stats['requests'] += pool.num_requests
+            stats['connections_reused'] = max(stats['requests'] - stats['connections_created'], 0)
+            return stats
+
         def _implement_retry(self, retries=0,
                              status_list_to_retry=None,
                              backoff_factor=5,
@@ -6655,7 +6809,8 @@ if 'requests' in sys.modules:
                              raise_on_status=False):
             """
             Implements the retry mechanism.
-            In the default case where retries = 0 the request will fail on the first time
+            In the default case where retries = 0 the request will fail on the first time.
+            The retry policy is set on the adapter mounted by the client, keeping its connection pools.
 
             :type retries: ``int``
             :param retries: How many retries should be made in case of a failure. when set to '0'- will fail on the first time
@@ -6702,9 +6857,7 @@ if 'requests' in sys.modules:
                     raise_on_status=raise_on_status,
                     raise_on_redirect=raise_on_redirect
                 )
-                adapter = HTTPAdapter(max_retries=retry)
-                self._session.mount('http://', adapter)
-                self._session.mount('https://', adapter)
+                self._mount_adapter(retry)
             except NameError:
                 pass
 
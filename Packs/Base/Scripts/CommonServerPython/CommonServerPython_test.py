@@ -17,7 +17,7 @@ from CommonServerPython import xml2json, json2xml, entryTypes, formats, tableToM
     argToBoolean, ipv4Regex, ipv4cidrRegex, ipv6cidrRegex, ipv6Regex, batch, FeedIndicatorType, \
     encode_string_results, safe_load_json, remove_empty_elements, aws_table_to_markdown, is_demisto_version_ge, \
     appendContext, auto_detect_indicator_type, handle_proxy, get_demisto_version_as_str, get_x_content_info_headers, \
-    url_to_clickable_markdown, WarningsHandler, DemistoException
+    url_to_clickable_markdown, WarningsHandler, DemistoException, iter_table_to_markdown
 
 try:
     from StringIO import StringIO
@@ -478,6 +478,54 @@ def test_tbl_keep_headers_list():
     assert headers == ['header_1', 'header_2']
 
 
+def test_tbl_to_md_max_rows():
+    """
+    Given:
+        - A table with 3 rows and a cap of 2 rows.
+    When:
+        - Rendering the table to markdown.
+    Then:
+        - Only the first 2 rows are rendered, followed by a footer with the number of the rows left out.
+    """
+    table = tableToMarkdown('tableToMarkdown test with max rows', DATA, max_rows=2)
+    expected_table = '''### tableToMarkdown test with max rows
+|header_1|header_2|header_3|
+|---|---|---|
+| a1 | b1 | c1 |
+| a2 | b2 | c2 |
+
+**1 more rows.**
+'''
+    assert table == expected_table
+    assert tableToMarkdown('tableToMarkdown test', DATA, max_rows=3) == tableToMarkdown('tableToMarkdown test', DATA)
+
+
+def test_iter_table_to_markdown():
+    """
+    Given:
+        - A generator of rows, some of them with an empty column.
+    When:
+        - Rendering the rows with iter_table_to_markdown, with and without removeNull.
+    Then:
+        - The joined pieces are the same as the tableToMarkdown output for the equivalent list.
+        - The rows are rendered one per yielded piece.
+    """
+    data = [{'header_1': 'a{}'.format(i), 'header_2': None, 'header_3': 'c|{}'.format(i)} for i in range(5)]
+
+    pieces = list(iter_table_to_markdown('tableToMarkdown test', (row for row in data)))
+    assert len(pieces) == 3 + len(data)
+    assert ''.join(pieces) == tableToMarkdown('tableToMarkdown test', data)
+
+    table = ''.join(iter_table_to_markdown('tableToMarkdown test', iter(data), removeNull=True, max_rows=4))
+    assert table == tableToMarkdown('tableToMarkdown test', data, removeNull=True, max_rows=4)
+    assert 'header_2' not in table
+    assert '| a3 | c\\|3 |' in table
+    assert table.endswith('\n**1 more rows.**\n')
+
+    assert ''.join(iter_table_to_markdown('tableToMarkdown test', iter([]))) == \
+        '### tableToMarkdown test\n**No entries.**\n'
+
+
 @pytest.mark.parametrize('data, expected_data', COMPLEX_DATA_WITH_URLS)
 def test_url_to_clickable_markdown(data, expected_data):
     table = url_to_clickable_markdown(data, url_keys=['url', 'links'])
@@ -2098,6 +2146,73 @@ class TestBaseClient:
         res = self.client._http_request('get', 'event', resp_type='response')
         assert isinstance(res, requests.Response)
 
+    def test_http_request_retries_keep_adapter(self, requests_mock):
+        """
+            Given
+            - A base client configured with 2 retries
+            When
+            - Making http requests with and without overriding the retries
+            Then
+            - Ensure the same adapter stays mounted and only its retry policy changes
+        """
+        from CommonServerPython import BaseClient
+        client = BaseClient('http://example.com/api/v2/', pool_maxsize=20, retries=2)
+        adapter = client._session.adapters['https://']
+        assert adapter is client._adapter
+        assert adapter._pool_maxsize == 20
+        assert adapter.max_retries.total == 2
+
+        requests_mock.get('http://example.com/api/v2/event', json=self.text)
+        client._http_request('get', 'event', retries=4)
+        client._http_request('get', 'event')
+
+        assert client._session.adapters['http://'] is adapter
+        assert client._session.adapters['https://'] is adapter
+        assert adapter.max_retries.total == 4
+
+    def test_connection_pool_stats(self):
+        """
+            Given
+            - A local keep-alive HTTP server
+            When
+            - Making several http requests with a base client
+            Then
+            - Ensure a single connection is created and reused by the rest of the requests
+        """
+        import threading
+        from CommonServerPython import BaseClient
+        try:
+            from http.server import HTTPServer, BaseHTTPRequestHandler
+        except ImportError:
+            from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+        class KeepAliveHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = json.dumps(TestBaseClient.text).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        server_thread = threading.Thread(target=server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        try:
+            client = BaseClient('http://127.0.0.1:{}/'.format(server.server_port))
+            for _ in range(3):
+                assert client._http_request('get', 'event') == self.text
+            assert client._get_connection_pool_stats() == {'pools': 1, 'connections_created': 1,
+                                                           'connections_reused': 2, 'requests': 3}
+        finally:
+            server.shutdown()
+            server.server_close()
+
     def test_http_request_proxy_false(self):
         from CommonServerPython import BaseClient
         import requests_mock
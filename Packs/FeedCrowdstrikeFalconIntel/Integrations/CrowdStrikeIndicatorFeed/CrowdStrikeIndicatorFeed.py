@@ -110,7 +110,8 @@ class Client(CrowdStrikeClient):
                 timestamp = response.get('resources', [])[-1].get('last_updated')
 
         if response.get('meta', {}).get('pagination', {}).get('total', 0) and fetch_command:
-            demisto.setIntegrationContext({'last_modified_time': timestamp})
+            # keep the rest of the integration context, e.g. the cached access token
+            demisto.setIntegrationContext({**demisto.getIntegrationContext(), 'last_modified_time': timestamp})
             demisto.info(f'set last_run: {timestamp}')
 
         indicators = self.create_indicators_from_response(response, self.tlp_color)
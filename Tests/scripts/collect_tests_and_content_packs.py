@@ -118,6 +118,122 @@ class TestConf(object):
         return test_playbooks
 
 
+class IdSetIndex(object):
+    """Lookup tables over the id_set, built once per collection run instead of scanning the id_set lists.
+
+    The tables of an entity type are built on first use. Every table keeps the id_set order of its objects,
+    so lookups return the same object a scan over the id_set list would.
+    """
+
+    def __init__(self, id_set: dict) -> None:
+        self._id_set = id_set
+        self._objects: Dict[str, Dict[str, list]] = {}
+        self._dependents: Dict[Tuple[str, str], Dict[str, list]] = {}
+
+    def _get_objects_table(self, entity_type: str) -> Dict[str, list]:
+        """Maps each id and name of the entity type to its (object, is id match) pairs, in id_set order."""
+        if entity_type not in self._objects:
+            table: Dict[str, list] = {}
+            for obj_wrpr in self._id_set.get(entity_type, []):
+                for obj_id, obj in obj_wrpr.items():
+                    table.setdefault(obj_id, []).append((obj, True))
+                obj_keys = list(obj_wrpr.keys())
+                if obj_keys:
+                    obj = obj_wrpr[obj_keys[0]]
+                    obj_name = obj.get('name')
+                    # an id match takes precedence over a name match of the same object
+                    if obj_name not in obj_wrpr:
+                        table.setdefault(obj_name, []).append((obj, False))
+            self._objects[entity_type] = table
+        return self._objects[entity_type]
+
+    def _get_dependents_table(self, entity_type: str, dependency_field: str) -> Dict[str, list]:
+        """Maps each value of the dependency field to the non-deprecated objects which list it, in id_set order.
+
+        For example, ('playbooks', 'implementing_scripts') maps a script name to the playbooks using the script.
+        """
+        key = (entity_type, dependency_field)
+        if key not in self._dependents:
+            table: Dict[str, list] = {}
+            for position, obj_wrpr in enumerate(self._id_set.get(entity_type, [])):
+                obj = list(obj_wrpr.values())[0]
+                if obj.get('deprecated', False):
+                    continue
+                for dependency in set(obj.get(dependency_field, [])):
+                    table.setdefault(dependency, []).append((position, obj))
+            self._dependents[key] = table
+        return self._dependents[key]
+
+    def get(self, entity_type: str, obj_id: str) -> Optional[dict]:
+        """Gets the first object of the entity type with the given id."""
+        return next((obj for obj, is_id_match in self._get_objects_table(entity_type).get(obj_id, []) if is_id_match),
+                    None)
+
+    def get_matching_object(self, entity_type: str, obj_id: str, server_version: str = '0') -> Optional[dict]:
+        """Gets the first object of the entity type with matching id/name and valid from/to version.
+
+        Same as `extract_matching_object_from_id_set` over the entity type's id_set list.
+        """
+        for obj, _ in self._get_objects_table(entity_type).get(obj_id, []):
+            if is_runnable_in_server_version(from_v=obj.get('fromversion', '0.0'), server_v=server_version,
+                                             to_v=obj.get('toversion', '99.99.99')):
+                return obj
+        return None
+
+    def get_dependents(self, entity_type: str, name: str, version: tuple):
+        """Gets the scripts and playbooks which use the given script/playbook, in the order they are enriched.
+
+        :param entity_type: 'scripts' or 'playbooks', the type of the used object.
+        :param name: The name of the used object.
+        :param version: The (fromversion, toversion) of the used object. Objects with an older toversion are skipped.
+
+        :return: An iterator of ('scripts' or 'playbooks', object) pairs.
+        """
+        if entity_type == 'scripts':
+            candidates = [('scripts', self._get_dependents_table('scripts', 'script_executions').get(name, [])),
+                          ('playbooks', self._get_dependents_table('playbooks', 'implementing_scripts').get(name, []))]
+        else:
+            candidates = [('playbooks', self._get_dependents_table('playbooks', 'implementing_playbooks').get(name, []))]
+
+        for dependent_type, dependents in candidates:
+            for _, obj in dependents:
+                if obj.get('toversion', '99.99.99') >= version[1]:
+                    yield dependent_type, obj
+
+    def get_command_dependents(self, integration_id: str, integration_commands: list, version: tuple):
+        """Gets the playbooks and scripts which use the given commands of the integration.
+
+        :param integration_id: The id of the integration.
+        :param integration_commands: The commands of the integration.
+        :param version: The (fromversion, toversion) of the integration. Objects with an older toversion are skipped.
+
+        :return: An iterator of ('scripts' or 'playbooks', object) pairs.
+        """
+        for dependent_type, dependency_field in [('playbooks', 'command_to_integration'), ('scripts', 'depends_on')]:
+            table = self._get_dependents_table(dependent_type, dependency_field)
+            dependents = {}
+            for integration_command in integration_commands:
+                for position, obj in table.get(integration_command, []):
+                    dependents[position] = obj
+
+            for position in sorted(dependents):
+                obj = dependents[position]
+                if obj.get('toversion', '99.99.99') < version[1]:
+                    continue
+                command_to_integration = obj.get('command_to_integration', {})
+                for integration_command in integration_commands:
+                    if dependent_type == 'playbooks':
+                        is_dependent = integration_command in command_to_integration and \
+                            (not command_to_integration.get(integration_command)
+                             or command_to_integration.get(integration_command) == integration_id)
+                    else:
+                        is_dependent = integration_command in obj.get('depends_on', []) and \
+                            command_to_integration.get(integration_command) == integration_id
+                    if is_dependent:
+                        yield dependent_type, obj
+                        break
+
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONTENT_DIR = os.path.abspath(SCRIPT_DIR + '/../..')
 sys.path.append(CONTENT_DIR)
@@ -297,28 +413,29 @@ def is_integration_fetching_incidents(integration_yml_path):
     return integration_yml_dict.get('script').get('isfetch', False) is True
 
 
-def id_set__get_test_playbook(id_set, test_playbook_id):
-    for test_playbook in id_set.get('TestPlaybooks', []):
-        if test_playbook_id in test_playbook.keys():
-            return test_playbook[test_playbook_id]
+def id_set__get_test_playbook(id_set, test_playbook_id, id_set_index=None):
+    id_set_index = id_set_index or IdSetIndex(id_set)
+    return id_set_index.get('TestPlaybooks', test_playbook_id)
 
 
-def id_set__get_integration_file_path(id_set, integration_id):
-    for integration in id_set.get('integrations', []):
-        if integration_id in integration.keys():
-            return integration[integration_id]['file_path']
+def id_set__get_integration_file_path(id_set, integration_id, id_set_index=None):
+    id_set_index = id_set_index or IdSetIndex(id_set)
+    integration = id_set_index.get('integrations', integration_id)
+    if integration is not None:
+        return integration['file_path']
     logging.critical(f'Could not find integration "{integration_id}" in the id_set')
 
 
-def check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, conf, tests_set):
+def check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, conf, tests_set, id_set_index=None):
     # If integration is mentioned/used in one of the test configurations, it means that integration is tested.
     # For example there could be a test playbook that tests fetch incidents command of some integration
     # so the test playbook will use FetchFromInstance script in the playbook, which is not direct command of a specific
     # integration
 
+    id_set_index = id_set_index or IdSetIndex(id_set)
     missing_integration_ids = missing_ids & integration_ids
     for missing_id in missing_integration_ids:
-        integration_file_path = id_set__get_integration_file_path(id_set, missing_id)
+        integration_file_path = id_set__get_integration_file_path(id_set, missing_id, id_set_index)
         is_fetching = is_integration_fetching_incidents(integration_file_path)
         if not is_fetching:
             continue
@@ -329,7 +446,7 @@ def check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, con
             continue
 
         for test_playbook_id in test_playbook_ids:
-            test_playbook = id_set__get_test_playbook(id_set, test_playbook_id)
+            test_playbook = id_set__get_test_playbook(id_set, test_playbook_id, id_set_index)
             if test_playbook and 'FetchFromInstance' in test_playbook.get('implementing_scripts', []):
                 missing_ids = missing_ids - {missing_id}
                 tests_set.add(test_playbook_id)
@@ -341,9 +458,10 @@ def find_tests_and_content_packs_for_modified_files(modified_files, conf=deepcop
     script_names = set([])
     playbook_names = set([])
     integration_ids = set([])
+    id_set_index = IdSetIndex(id_set)
 
     tests_set, caught_scripts, caught_playbooks, packs_to_install = collect_changed_ids(
-        integration_ids, playbook_names, script_names, modified_files, id_set)
+        integration_ids, playbook_names, script_names, modified_files, id_set, id_set_index)
 
     test_ids, missing_ids, caught_missing_test, test_packs_to_install = collect_tests_and_content_packs(
         script_names, playbook_names, integration_ids, caught_scripts, caught_playbooks, tests_set, id_set, conf)
@@ -352,7 +470,8 @@ def find_tests_and_content_packs_for_modified_files(modified_files, conf=deepcop
 
     missing_ids = update_with_tests_sections(missing_ids, modified_files, test_ids, tests_set)
 
-    missing_ids, tests_set = check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, conf, tests_set)
+    missing_ids, tests_set = check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, conf, tests_set,
+                                                                id_set_index)
 
     if len(missing_ids) > 0:
         test_string = '\n'.join(missing_ids)
@@ -459,7 +578,8 @@ def get_api_module_integrations(changed_api_modules, integration_set):
     return integration_ids_to_test, integration_to_version
 
 
-def collect_changed_ids(integration_ids, playbook_names, script_names, modified_files, id_set=deepcopy(ID_SET)):
+def collect_changed_ids(integration_ids, playbook_names, script_names, modified_files, id_set=deepcopy(ID_SET),
+                        id_set_index=None):
     tests_set = set([])
     updated_script_names = set([])
     updated_playbook_names = set([])
@@ -497,6 +617,7 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
     script_set = id_set['scripts']
     playbook_set = id_set['playbooks']
     integration_set = id_set['integrations']
+    id_set_index = id_set_index or IdSetIndex(id_set)
 
     if changed_api_modules:
         integration_ids_to_test, integration_to_version_to_add = get_api_module_integrations(changed_api_modules,
@@ -511,17 +632,18 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
     for script_id in script_names:
         enrich_for_script_id(script_id, script_to_version[script_id], script_names, script_set, playbook_set,
                              playbook_names, updated_script_names, updated_playbook_names, catched_scripts,
-                             catched_playbooks, tests_set)
+                             catched_playbooks, tests_set, id_set_index)
 
     integration_to_command, deprecated_commands_message = get_integration_commands(integration_ids, integration_set)
     for integration_id, integration_commands in integration_to_command.items():
         enrich_for_integration_id(integration_id, integration_to_version[integration_id], integration_commands,
                                   script_set, playbook_set, playbook_names, script_names, updated_script_names,
-                                  updated_playbook_names, catched_scripts, catched_playbooks, tests_set)
+                                  updated_playbook_names, catched_scripts, catched_playbooks, tests_set,
+                                  id_set_index)
 
     for playbook_id in playbook_names:
         enrich_for_playbook_id(playbook_id, playbook_to_version[playbook_id], playbook_names, script_set, playbook_set,
-                               updated_playbook_names, catched_playbooks, tests_set)
+                               updated_playbook_names, catched_playbooks, tests_set, id_set_index)
 
     for new_script in updated_script_names:
         script_names.add(new_script)
@@ -608,7 +730,7 @@ def exclude_deprecated_entities(script_set, script_names,
 
 def enrich_for_integration_id(integration_id, given_version, integration_commands, script_set, playbook_set,
                               playbook_names, script_names, updated_script_names, updated_playbook_names,
-                              catched_scripts, catched_playbooks, tests_set):
+                              catched_scripts, catched_playbooks, tests_set, id_set_index=None):
     """Enrich the list of affected scripts/playbooks by your change set.
 
     :param integration_id: The name of the integration we changed.
@@ -623,135 +745,81 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
     :param catched_scripts: The names of scripts we found tests for.
     :param catched_playbooks: The names of playbooks we found tests for.
     :param tests_set: The names of the caught tests.
+    :param id_set_index: The IdSetIndex of the id_set, built from script_set and playbook_set if not given.
     """
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
-        if playbook_data.get('deprecated', False):
-            continue
-        playbook_name = playbook_data.get('name')
-        playbook_fromversion = playbook_data.get('fromversion', '0.0.0')
-        playbook_toversion = playbook_data.get('toversion', '99.99.99')
-        command_to_integration = playbook_data.get('command_to_integration', {})
-        implementing_commands = command_to_integration.keys()
-        for integration_command in integration_commands:
-            if integration_command in implementing_commands and playbook_toversion >= given_version[1]:
-                if playbook_name not in playbook_names and playbook_name not in updated_playbook_names:
-                    if not command_to_integration.get(integration_command) or \
-                            command_to_integration.get(integration_command) == integration_id:
-
-                        tests = set(playbook_data.get('tests', []))
-                        if tests:
-                            catched_playbooks.add(playbook_name)
-                            update_test_set(tests, tests_set)
-
-                        updated_playbook_names.add(playbook_name)
-                        new_versions = (playbook_fromversion, playbook_toversion)
-                        enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
-                                               updated_playbook_names, catched_playbooks, tests_set)
-
-    for script in script_set:
-        script_data = list(script.values())[0]
-        if script_data.get('deprecated', False):
-            continue
-        script_name = script_data.get('name')
-        script_file_path = script_data.get('file_path')
-        script_fromversion = script_data.get('fromversion', '0.0.0')
-        script_toversion = script_data.get('toversion', '99.99.99')
-        command_to_integration = script_data.get('command_to_integration', {})
-        for integration_command in integration_commands:
-            if integration_command in script_data.get('depends_on', []):
-                if integration_command in command_to_integration.keys() and \
-                        command_to_integration[integration_command] == integration_id and \
-                        script_toversion >= given_version[1]:
-
-                    if script_name not in script_names and script_name not in updated_script_names:
-                        tests = script_data.get('tests', [])
-                        if tests:
-                            catched_scripts.add(script_name)
-                            update_test_set(tests, tests_set)
-
-                        package_name = os.path.dirname(script_file_path)
-                        if glob.glob(package_name + "/*_test.py"):
-                            catched_scripts.add(script_name)
-                            tests_set.add('Found a unittest for the script {}'.format(script_name))
-
-                        updated_script_names.add(script_name)
-                        new_versions = (script_fromversion, script_toversion)
-                        enrich_for_script_id(script_name, new_versions, script_names, script_set, playbook_set,
-                                             playbook_names, updated_script_names, updated_playbook_names,
-                                             catched_scripts, catched_playbooks, tests_set)
+    id_set_index = id_set_index or IdSetIndex({'scripts': script_set, 'playbooks': playbook_set})
+    enrich_for_dependents(id_set_index.get_command_dependents(integration_id, integration_commands, given_version),
+                          id_set_index, script_names, playbook_names, updated_script_names, updated_playbook_names,
+                          catched_scripts, catched_playbooks, tests_set)
 
 
 def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, script_set, playbook_set,
-                           updated_playbook_names, catched_playbooks, tests_set):
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
-        if playbook_data.get('deprecated', False):
-            continue
-        playbook_name = playbook_data.get('name')
-        playbook_fromversion = playbook_data.get('fromversion', '0.0.0')
-        playbook_toversion = playbook_data.get('toversion', '99.99.99')
-        if given_playbook_id in playbook_data.get('implementing_playbooks', []) and \
-                playbook_toversion >= given_version[1]:
+                           updated_playbook_names, catched_playbooks, tests_set, id_set_index=None):
+    id_set_index = id_set_index or IdSetIndex({'scripts': script_set, 'playbooks': playbook_set})
+    # a playbook is used only by other playbooks, so no script is added to the script names
+    enrich_for_dependents(id_set_index.get_dependents('playbooks', given_playbook_id, given_version),
+                          id_set_index, set(), playbook_names, set(), updated_playbook_names,
+                          set(), catched_playbooks, tests_set)
 
-            if playbook_name not in playbook_names and playbook_name not in updated_playbook_names:
-                tests = set(playbook_data.get('tests', []))
-                if tests:
-                    catched_playbooks.add(playbook_name)
-                    update_test_set(tests, tests_set)
 
-                updated_playbook_names.add(playbook_name)
-                new_versions = (playbook_fromversion, playbook_toversion)
-                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
-                                       updated_playbook_names, catched_playbooks, tests_set)
+def enrich_for_script_id(given_script_id, given_version, script_names, script_set, playbook_set, playbook_names,
+                         updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks, tests_set,
+                         id_set_index=None):
+    id_set_index = id_set_index or IdSetIndex({'scripts': script_set, 'playbooks': playbook_set})
+    enrich_for_dependents(id_set_index.get_dependents('scripts', given_script_id, given_version),
+                          id_set_index, script_names, playbook_names, updated_script_names, updated_playbook_names,
+                          catched_scripts, catched_playbooks, tests_set)
 
 
-def enrich_for_script_id(given_script_id, given_version, script_names, script_set, playbook_set, playbook_names,
-                         updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks, tests_set):
-    for script in script_set:
-        script_data = list(script.values())[0]
-        if script_data.get('deprecated', False):
-            continue
-        script_name = script_data.get('name')
-        script_file_path = script_data.get('file_path')
-        script_fromversion = script_data.get('fromversion', '0.0.0')
-        script_toversion = script_data.get('toversion', '99.99.99')
-        if given_script_id in script_data.get('script_executions', []) and script_toversion >= given_version[1]:
-            if script_name not in script_names and script_name not in updated_script_names:
-                tests = set(script_data.get('tests', []))
-                if tests:
-                    catched_scripts.add(script_name)
-                    update_test_set(tests, tests_set)
-
-                package_name = os.path.dirname(script_file_path)
-                if glob.glob(package_name + "/*_test.py"):
-                    catched_scripts.add(script_name)
-                    tests_set.add('Found a unittest for the script {}'.format(script_name))
-
-                updated_script_names.add(script_name)
-                new_versions = (script_fromversion, script_toversion)
-                enrich_for_script_id(script_name, new_versions, script_names, script_set, playbook_set, playbook_names,
-                                     updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks,
-                                     tests_set)
-
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
-        if playbook_data.get('deprecated', False):
+def enrich_for_dependents(dependents, id_set_index, script_names, playbook_names, updated_script_names,
+                          updated_playbook_names, catched_scripts, catched_playbooks, tests_set):
+    """Adds the given dependents, and everything which depends on them, to the affected scripts/playbooks.
+
+    The dependency graph is walked depth first with an explicit stack, in the same order as the id_set lists.
+
+    :param dependents: An iterator of ('scripts' or 'playbooks', object) pairs which use the changed entity.
+    :param id_set_index: The IdSetIndex of the id_set.
+    :param script_names: The names of the scripts affected by your changes.
+    :param playbook_names: The names of the playbooks affected by your changes.
+    :param updated_script_names: The names of scripts we identify as affected to your change set.
+    :param updated_playbook_names: The names of playbooks we identify as affected to your change set.
+    :param catched_scripts: The names of scripts we found tests for.
+    :param catched_playbooks: The names of playbooks we found tests for.
+    :param tests_set: The names of the caught tests.
+    """
+    stack = [dependents]
+    while stack:
+        entity_type, entity_data = next(stack[-1], (None, None))
+        if entity_type is None:
+            stack.pop()
             continue
-        playbook_name = playbook_data.get('name')
-        playbook_fromversion = playbook_data.get('fromversion', '0.0.0')
-        playbook_toversion = playbook_data.get('toversion', '99.99.99')
-        if given_script_id in playbook_data.get('implementing_scripts', []) and playbook_toversion >= given_version[1]:
-            if playbook_name not in playbook_names and playbook_name not in updated_playbook_names:
-                tests = set(playbook_data.get('tests', []))
-                if tests:
-                    catched_playbooks.add(playbook_name)
-                    update_test_set(tests, tests_set)
-
-                updated_playbook_names.add(playbook_name)
-                new_versions = (playbook_fromversion, playbook_toversion)
-                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
-                                       updated_playbook_names, catched_playbooks, tests_set)
+
+        entity_name = entity_data.get('name')
+        tests = set(entity_data.get('tests', []))
+        if entity_type == 'scripts':
+            if entity_name in script_names or entity_name in updated_script_names:
+                continue
+            if tests:
+                catched_scripts.add(entity_name)
+                update_test_set(tests, tests_set)
+
+            package_name = os.path.dirname(entity_data.get('file_path'))
+            if glob.glob(package_name + "/*_test.py"):
+                catched_scripts.add(entity_name)
+                tests_set.add('Found a unittest for the script {}'.format(entity_name))
+
+            updated_script_names.add(entity_name)
+        else:
+            if entity_name in playbook_names or entity_name in updated_playbook_names:
+                continue
+            if tests:
+                catched_playbooks.add(entity_name)
+                update_test_set(tests, tests_set)
+
+            updated_playbook_names.add(entity_name)
+
+        new_versions = (entity_data.get('fromversion', '0.0.0'), entity_data.get('toversion', '99.99.99'))
+        stack.append(id_set_index.get_dependents(entity_type, entity_name, new_versions))
 
 
 def update_test_set(tests, tests_set):
@@ -851,7 +919,7 @@ def get_test_from_conf(branch_name, conf=deepcopy(CONF)):
     return tests
 
 
-def is_test_runnable(test_id, id_set, conf, server_version):
+def is_test_runnable(test_id, id_set, conf, server_version, id_set_index=None):
     """Checks whether the test is runnable
     1. Test is not skipped.
     2. Test playbook / integration is not skipped.
@@ -875,8 +943,8 @@ def is_test_runnable(test_id, id_set, conf, server_version):
         return False
     conf_fromversion = test_conf.get('fromversion', '0.0')
     conf_toversion = test_conf.get('toversion', '99.99.99')
-    test_playbooks_set = id_set.get('TestPlaybooks', [])
-    test_playbook_obj = extract_matching_object_from_id_set(test_id, test_playbooks_set, server_version)
+    id_set_index = id_set_index or IdSetIndex(id_set)
+    test_playbook_obj = id_set_index.get_matching_object('TestPlaybooks', test_id, server_version)
 
     # check whether the test is runnable in id_set
     if not test_playbook_obj:
@@ -884,7 +952,7 @@ def is_test_runnable(test_id, id_set, conf, server_version):
         return False
 
     # check used integrations available
-    if not is_test_integrations_available(server_version, test_conf, conf, id_set):
+    if not is_test_integrations_available(server_version, test_conf, conf, id_set, id_set_index):
         logging.debug(f'{warning_prefix} - no active integration found')
         return False
 
@@ -896,7 +964,7 @@ def is_test_runnable(test_id, id_set, conf, server_version):
     return True
 
 
-def is_test_integrations_available(server_version, test_conf, conf, id_set):
+def is_test_integrations_available(server_version, test_conf, conf, id_set, id_set_index=None):
     """
     Check if all used integrations are skipped / available
     """
@@ -907,8 +975,8 @@ def is_test_integrations_available(server_version, test_conf, conf, id_set):
         if not is_test_uses_active_integration(test_integration_ids, conf):
             return False
         # check if all integration from/toversion is valid with server_version
-        integrations_set = id_set.get('integrations', [])
-        if any(extract_matching_object_from_id_set(integration_id, integrations_set, server_version) is None for
+        id_set_index = id_set_index or IdSetIndex(id_set)
+        if any(id_set_index.get_matching_object('integrations', integration_id, server_version) is None for
                integration_id in
                test_integration_ids):
             return False
@@ -14,8 +14,9 @@ import Tests
 from demisto_sdk.commands.common.constants import (PACK_METADATA_SUPPORT,
                                                    PACKS_PACK_META_FILE_NAME)
 from Tests.scripts.collect_tests_and_content_packs import (
-    PACKS_DIR, TestConf, collect_content_packs_to_install,
-    create_filter_envs_file, get_from_version_and_to_version_bounderies,
+    PACKS_DIR, IdSetIndex, TestConf, collect_content_packs_to_install,
+    create_filter_envs_file, enrich_for_integration_id, enrich_for_script_id,
+    extract_matching_object_from_id_set, get_from_version_and_to_version_bounderies,
     get_test_list_and_content_packs_to_install, is_documentation_changes_only,
     remove_ignored_tests, remove_tests_for_non_supported_packs, is_release_branch)
 from Tests.scripts.utils.get_modified_files_for_testing import get_modified_files_for_testing, ModifiedFiles
@@ -940,6 +941,114 @@ class TestExtractMatchingObjectFromIdSet:
             collect_tests_and_content_packs._FAILED = False
 
 
+class TestIdSetIndex:
+    ID_SET = {
+        'scripts': [
+            {'script_a': {'name': 'script_a', 'file_path': 'Packs/A/Scripts/script_a/script_a.yml',
+                          'depends_on': ['command-a'], 'command_to_integration': {'command-a': 'integration_a'}}},
+            {'script_b': {'name': 'script_b', 'file_path': 'Packs/A/Scripts/script_b/script_b.yml',
+                          'script_executions': ['script_a'], 'tests': ['test_b']}},
+            {'script_c': {'name': 'script_c', 'file_path': 'Packs/A/Scripts/script_c/script_c.yml',
+                          'script_executions': ['script_a'], 'toversion': '4.5.0', 'tests': ['test_c']}},
+            {'script_d': {'name': 'script_d', 'file_path': 'Packs/A/Scripts/script_d/script_d.yml',
+                          'script_executions': ['script_b'], 'deprecated': True, 'tests': ['test_d']}},
+        ],
+        'playbooks': [
+            {'playbook_a': {'name': 'playbook_a', 'implementing_scripts': ['script_b'], 'tests': ['test_pb_a']}},
+            {'playbook_b': {'name': 'playbook_b', 'implementing_playbooks': ['playbook_a']}},
+            {'playbook_c': {'name': 'playbook_c', 'command_to_integration': {'command-a': ''},
+                            'tests': ['test_pb_c']}},
+            {'playbook_d': {'name': 'playbook_d', 'command_to_integration': {'command-a': 'integration_b'},
+                            'tests': ['test_pb_d']}},
+        ],
+        'integrations': [
+            {'integration_a': {'name': 'Integration A', 'file_path': 'Packs/A/Integrations/a.yml',
+                               'toversion': '5.9.9'}},
+            {'integration_a': {'name': 'Integration A', 'file_path': 'Packs/A/Integrations/a_6.yml',
+                               'fromversion': '6.0.0'}},
+        ]
+    }
+
+    @pytest.mark.parametrize('entity_type, obj_id, server_version', [
+        ('integrations', 'integration_a', '5.5.0'),
+        ('integrations', 'integration_a', '6.0.0'),
+        ('integrations', 'Integration A', '6.0.0'),
+        ('scripts', 'script_c', '5.0.0'),
+        ('scripts', 'script_c', '4.1.0'),
+        ('scripts', 'no_such_script', '6.0.0'),
+    ])
+    def test_get_matching_object(self, entity_type, obj_id, server_version):
+        """
+        Given
+        - An id_set with objects matching by id, by name and by from/to version.
+
+        When
+        - Getting the matching object from the IdSetIndex.
+
+        Then
+        - Ensure the same object as extract_matching_object_from_id_set is returned.
+        """
+        id_set_index = IdSetIndex(self.ID_SET)
+        expected_obj = extract_matching_object_from_id_set(obj_id, self.ID_SET[entity_type], server_version)
+
+        assert id_set_index.get_matching_object(entity_type, obj_id, server_version) is expected_obj
+        if entity_type == 'integrations' and obj_id == 'integration_a':
+            assert id_set_index.get(entity_type, obj_id) is self.ID_SET['integrations'][0]['integration_a']
+
+    def test_enrich_for_integration_id(self, mocker):
+        """
+        Given
+        - integration_a, whose command is used by script_a and playbook_c.
+        - script_b and script_c execute script_a, script_c only up to version 4.5.0.
+        - playbook_a uses script_b and is used by playbook_b.
+        - script_d uses script_b but is deprecated, and playbook_d uses the command of another integration.
+
+        When
+        - Enriching the affected entities of integration_a.
+
+        Then
+        - Ensure the dependents are collected recursively, skipping deprecated, too old and unrelated entities.
+        """
+        mocker.patch('glob.glob', return_value=[])
+        script_names, playbook_names = set(), set()
+        updated_script_names, updated_playbook_names = set(), set()
+        catched_scripts, catched_playbooks, tests_set = set(), set(), set()
+
+        enrich_for_integration_id('integration_a', ('0.0.0', '99.99.99'), ['command-a'], self.ID_SET['scripts'],
+                                  self.ID_SET['playbooks'], playbook_names, script_names, updated_script_names,
+                                  updated_playbook_names, catched_scripts, catched_playbooks, tests_set,
+                                  IdSetIndex(self.ID_SET))
+
+        assert updated_script_names == {'script_a', 'script_b'}
+        assert updated_playbook_names == {'playbook_a', 'playbook_b', 'playbook_c'}
+        assert catched_scripts == {'script_b'}
+        assert catched_playbooks == {'playbook_a', 'playbook_c'}
+        assert tests_set == {'test_b', 'test_pb_a', 'test_pb_c'}
+
+    def test_enrich_for_script_id_deep_chain(self, mocker):
+        """
+        Given
+        - A chain of playbooks, each one using the previous one, deeper than the recursion limit.
+
+        When
+        - Enriching the affected entities of the script used by the first playbook.
+
+        Then
+        - Ensure all the playbooks in the chain are collected.
+        """
+        mocker.patch('glob.glob', return_value=[])
+        chain_length = 2000
+        playbook_set = [{'playbook_0': {'name': 'playbook_0', 'implementing_scripts': ['script_a']}}]
+        playbook_set += [{f'playbook_{i}': {'name': f'playbook_{i}', 'implementing_playbooks': [f'playbook_{i - 1}']}}
+                         for i in range(1, chain_length)]
+        updated_playbook_names = set()
+
+        enrich_for_script_id('script_a', ('0.0.0', '99.99.99'), {'script_a'}, [], playbook_set, set(), set(),
+                             updated_playbook_names, set(), set(), set())
+
+        assert len(updated_playbook_names) == chain_length
+
+
 def test_modified_integration_content_pack_is_collected(mocker):
     """
     Given